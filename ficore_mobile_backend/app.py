@@ -1,11 +1,16 @@
 from flask import Flask, request, jsonify, Response, redirect, url_for, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_pymongo import PyMongo
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
+import atexit
 import jwt
+import logging
 import os
+import queue
 from bson import ObjectId
 from functools import wraps
 from werkzeug.security import generate_password_hash
@@ -34,6 +39,16 @@ from blueprints.reminders import init_reminders_blueprint
 # Import database models
 from models import DatabaseInitializer
 
+# Route log records through a queue so request threads never block on log I/O
+log_queue = queue.Queue(-1)
+log_handler = logging.StreamHandler()
+log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+log_listener = QueueListener(log_queue, log_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+logging.getLogger().addHandler(QueueHandler(log_queue))
+logging.getLogger().setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
 app = Flask(__name__)
 
 # Configuration
@@ -41,6 +56,27 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'ficore-mobile-secret-ke
 app.config['MONGO_URI'] = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/ficore_mobile')
 app.config['JWT_EXPIRATION_DELTA'] = timedelta(hours=24)
 
+class MobileJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes ObjectIds and writes datetimes as ISO 8601 strings"""
+    
+    # Keep response keys in insertion order instead of sorting every dict on each jsonify call
+    sort_keys = False
+    
+    # Write non-ASCII text (e.g. currency symbols, names) as UTF-8 instead of \u escapes,
+    # and never pretty-print large report payloads, even in debug mode
+    ensure_ascii = False
+    compact = True
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, datetime):
+            return o.isoformat() + 'Z' if o.tzinfo is None else o.isoformat()
+        if isinstance(o, ObjectId):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+app.json = MobileJSONProvider(app)
+
 # Initialize extensions
 CORS(app, origins=['*'])
 mongo = PyMongo(app)
@@ -131,6 +167,12 @@ with app.app_context():
         print(f"✅ Verified {len(db_results['existing'])} existing collections")
     if db_results['errors']:
         print(f"⚠️  {len(db_results['errors'])} errors during initialization")
+    try:
+        backfilled_items = db_initializer.backfill_inventory_item_fields()
+        if backfilled_items:
+            print(f"✅ Backfilled {backfilled_items} inventory items")
+    except Exception as e:
+        print(f"⚠️  Inventory backfill error: {str(e)}")
     print("="*60 + "\n")
     
     # Initialize admin user
@@ -1051,6 +1051,7 @@ def init_admin_blueprint(mongo, token_required, admin_required, serialize_doc):
             mongo.db.users.delete_one({'_id': ObjectId(user_id)})
             mongo.db.expenses.delete_many({'userId': ObjectId(user_id)})
             mongo.db.incomes.delete_many({'userId': ObjectId(user_id)})
+            mongo.db.income_rollups.delete_many({'userId': ObjectId(user_id)})
             mongo.db.budgets.delete_many({'userId': ObjectId(user_id)})
             mongo.db.credit_requests.delete_many({'userId': ObjectId(user_id)})
             mongo.db.credit_transactions.delete_many({'userId': ObjectId(user_id)})
@@ -18,8 +18,7 @@ def init_debtors_blueprint(mongo, token_required, serialize_doc):
     """Initialize the comprehensive debtors blueprint with all features"""
     debtors_bp = Blueprint('debtors', __name__, url_prefix='/debtors')
 
-    # Setup logging
-    logging.basicConfig(level=logging.INFO)
+    # Setup logging; handlers and the level are configured once in app.py
     logger = logging.getLogger(__name__)
 
     def calculate_debt_age(created_date):
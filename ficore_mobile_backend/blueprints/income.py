@@ -2,14 +2,22 @@ from flask import Blueprint, request, jsonify, make_response
 from datetime import datetime, timedelta
 from bson import ObjectId
 import csv
+import heapq
 import io
+import logging
 from collections import defaultdict
+from pymongo import ReturnDocument
+from pymongo.errors import ExecutionTimeout, OperationFailure
 from utils.payment_utils import normalize_sales_type, validate_sales_type
 from utils.monthly_entry_tracker import MonthlyEntryTracker
+from utils.income_rollups import IncomeRollupTracker
+
+logger = logging.getLogger(__name__)
 
 def init_income_blueprint(mongo, token_required, serialize_doc):
     """Initialize the income blueprint with database and auth decorator"""
     income_bp = Blueprint('income', __name__, url_prefix='/income')
+    rollup_tracker = IncomeRollupTracker(mongo)
 
     @income_bp.route('', methods=['GET'])
     @token_required
@@ -206,6 +214,7 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
             
             result = mongo.db.incomes.insert_one(income_data)
             income_id = str(result.inserted_id)
+            rollup_tracker.apply(current_user['_id'], income_data)
             
             # NEW: Deduct FC if required (over monthly limit)
             if fc_check['deduct_fc']:
@@ -303,55 +312,59 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
             
             # Calculate totals with safe operations - NO RECURRING PROJECTIONS
             try:
-                # CRITICAL DEBUG: Log all income data for investigation
-                print(f"DEBUG INCOME SUMMARY - User: {current_user['_id']}")
-                print(f"DEBUG: Total incomes retrieved: {len(incomes)}")
-                print(f"DEBUG: Date ranges - Start of month: {start_of_month}, Start of year: {start_of_year}")
-                
-                # Debug each income record
-                for i, inc in enumerate(incomes):
-                    print(f"DEBUG Income {i+1}: ID={inc.get('_id')}, Amount={inc.get('amount')}, DateReceived={inc.get('dateReceived')}, Source={inc.get('source')}")
-                
-                # FIXED: Simple sum of actual amounts only, no multipliers or projections
-                this_month_incomes = [inc for inc in incomes if inc.get('dateReceived') and inc['dateReceived'] >= start_of_month]
-                print(f"DEBUG: This month incomes count: {len(this_month_incomes)}")
-                for i, inc in enumerate(this_month_incomes):
-                    print(f"DEBUG This Month Income {i+1}: Amount={inc.get('amount')}, DateReceived={inc.get('dateReceived')}")
-                
-                total_this_month = sum(inc.get('amount', 0) for inc in this_month_incomes)
-                print(f"DEBUG: CALCULATED total_this_month = {total_this_month}")
+                logger.debug("Income summary for user %s: %d incomes retrieved, month starts %s, year starts %s",
+                             current_user['_id'], len(incomes), start_of_month, start_of_year)
                 
-                last_month_incomes = [inc for inc in incomes if inc.get('dateReceived') and start_of_last_month <= inc['dateReceived'] < start_of_month]
-                total_last_month = sum(inc.get('amount', 0) for inc in last_month_incomes)
-                print(f"DEBUG: CALCULATED total_last_month = {total_last_month}")
+                # FIXED: Simple sum of actual amounts only, no multipliers or projections.
+                # Single pass with running sums - each row's fields are read once.
+                twelve_months_ago = now - timedelta(days=365)
+                total_this_month = 0
+                total_last_month = 0
+                year_to_date = 0
+                total_recent_amount = 0
+                recent_count = 0
+                this_month_count = 0
+                source_totals = defaultdict(float)
+                dated_incomes = []
+                for inc in incomes:
+                    amount = inc.get('amount', 0)
+                    date_received = inc.get('dateReceived')
+                    source = inc.get('source')
+                    
+                    # Top sources with safe operations
+                    if source and amount:
+                        source_totals[source] += amount
+                    
+                    if not date_received:
+                        continue
+                    dated_incomes.append(inc)
+                    
+                    if date_received >= start_of_month:
+                        total_this_month += amount
+                        this_month_count += 1
+                    elif date_received >= start_of_last_month:
+                        total_last_month += amount
+                    if date_received >= start_of_year:
+                        year_to_date += amount
+                    if date_received >= twelve_months_ago:
+                        total_recent_amount += amount
+                        recent_count += 1
                 
-                year_incomes = [inc for inc in incomes if inc.get('dateReceived') and inc['dateReceived'] >= start_of_year]
-                year_to_date = sum(inc.get('amount', 0) for inc in year_incomes)
-                print(f"DEBUG: CALCULATED year_to_date = {year_to_date}")
+                logger.debug("Income summary totals: this month %s from %d incomes, last month %s, year to date %s",
+                             total_this_month, this_month_count, total_last_month, year_to_date)
                 
-                # FIXED: Calculate average monthly based on actual received amounts only
-                twelve_months_ago = now - timedelta(days=365)
-                recent_incomes = [inc for inc in incomes 
-                                if inc.get('dateReceived') and inc['dateReceived'] >= twelve_months_ago]
                 # Calculate actual average based on received amounts, not projected
-                total_recent_amount = sum(inc.get('amount', 0) for inc in recent_incomes)
-                average_monthly = total_recent_amount / 12 if recent_incomes else 0
+                average_monthly = total_recent_amount / 12 if recent_count else 0
                 
                 # Get recent incomes (last 5)
-                recent_incomes_list = sorted([inc for inc in incomes if inc.get('dateReceived')], 
-                                           key=lambda x: x['dateReceived'], reverse=True)[:5]
+                recent_incomes_list = heapq.nlargest(5, dated_incomes, key=lambda x: x['dateReceived'])
                 recent_incomes_data = []
                 for income in recent_incomes_list:
                     income_data = serialize_doc(income.copy())
                     income_data['dateReceived'] = income_data.get('dateReceived', datetime.utcnow()).isoformat() + 'Z'
                     recent_incomes_data.append(income_data)
                 
-                # Top sources with safe operations
-                source_totals = defaultdict(float)
-                for income in incomes:
-                    if income.get('source') and income.get('amount'):
-                        source_totals[income['source']] += income['amount']
-                top_sources = dict(sorted(source_totals.items(), key=lambda x: x[1], reverse=True)[:5])
+                top_sources = dict(heapq.nlargest(5, source_totals.items(), key=lambda x: x[1]))
                 
                 # Growth percentage
                 growth_percentage = 0
@@ -369,13 +382,6 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
                     'growth_percentage': growth_percentage
                 }
                 
-                # CRITICAL DEBUG: Log the final response
-                print(f"DEBUG: FINAL INCOME SUMMARY RESPONSE:")
-                print(f"  total_this_month: {total_this_month}")
-                print(f"  total_last_month: {total_last_month}")
-                print(f"  year_to_date: {year_to_date}")
-                print(f"  total_records: {len(incomes)}")
-                
                 return jsonify({
                     'success': True,
                     'data': summary_data,
@@ -552,18 +558,6 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
                     'message': 'No data provided'
                 }), 400
 
-            # Find existing income record
-            existing_income = mongo.db.incomes.find_one({
-                '_id': ObjectId(income_id),
-                'userId': current_user['_id']
-            })
-
-            if not existing_income:
-                return jsonify({
-                    'success': False,
-                    'message': 'Income record not found'
-                }), 404
-
             # Validation
             errors = {}
             if 'amount' in data and (not data.get('amount') or data.get('amount', 0) <= 0):
@@ -610,23 +604,22 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
             if 'frequency' in data:
                 update_data['frequency'] = 'one_time'  # Always one-time now
 
-            # Update the income record
-            result = mongo.db.incomes.update_one(
+            # Update the income record, keeping the exact document this write replaced
+            # so concurrent updates each move their own pre-image between rollup rows
+            existing_income = mongo.db.incomes.find_one_and_update(
                 {'_id': ObjectId(income_id), 'userId': current_user['_id']},
-                {'$set': update_data}
+                {'$set': update_data},
+                return_document=ReturnDocument.BEFORE
             )
 
-            if result.matched_count == 0:
+            if not existing_income:
                 return jsonify({
                     'success': False,
                     'message': 'Income record not found'
                 }), 404
 
-            # Get updated income record
-            updated_income = mongo.db.incomes.find_one({
-                '_id': ObjectId(income_id),
-                'userId': current_user['_id']
-            })
+            updated_income = {**existing_income, **update_data}
+            rollup_tracker.apply_update(current_user['_id'], existing_income, updated_income)
 
             # Serialize the updated income
             income_data = serialize_doc(updated_income.copy())
@@ -667,18 +660,20 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
                 }), 400
 
             # Find and delete the income record
-            result = mongo.db.incomes.delete_one({
+            deleted_income = mongo.db.incomes.find_one_and_delete({
                 '_id': ObjectId(income_id),
                 'userId': current_user['_id']
             })
 
             # Check if a document was deleted
-            if result.deleted_count == 0:
+            if not deleted_income:
                 return jsonify({
                     'success': False,
                     'message': 'Income record not found or you do not have permission to delete it'
                 }), 404
 
+            rollup_tracker.apply(current_user['_id'], deleted_income, -1)
+
             return jsonify({
                 'success': True,
                 'message': 'Income record deleted successfully'
@@ -712,17 +707,15 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
             else:
                 end_date = now
             
-            # Get income data - ONLY actual received incomes within date range
-            query = {
-                'userId': current_user['_id'],
-                'dateReceived': {
-                    '$gte': start_date,
-                    '$lte': end_date
-                }
-            }
-            incomes = list(mongo.db.incomes.find(query))
+            # Get income data - ONLY actual received incomes within date range.
+            # Whole months are read from the income_rollups collection.
+            rollup_tracker.ensure_built(current_user)
+            stats = rollup_tracker.get_statistics(
+                current_user['_id'], start_date, end_date,
+                max_time_ms=5000  # 5 second timeout for performance
+            )
             
-            if not incomes:
+            if not stats['count']:
                 # Return empty statistics structure
                 return jsonify({
                     'success': True,
@@ -750,29 +743,17 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
                 })
             
             # Calculate statistics in the format expected by frontend
-            amounts = [inc.get('amount', 0) for inc in incomes]
-            total_amount = sum(amounts)
-            avg_amount = total_amount / len(amounts) if amounts else 0
-            max_amount = max(amounts) if amounts else 0
-            min_amount = min(amounts) if amounts else 0
-            
-            # Source breakdown
-            sources = {}
-            for income in incomes:
-                source = income.get('source', 'Unknown')
-                sources[source] = sources.get(source, 0) + income.get('amount', 0)
-            
-            # Monthly breakdown
-            monthly = {}
-            for income in incomes:
-                date = income.get('dateReceived', datetime.utcnow())
-                month_key = date.strftime('%Y-%m')
-                monthly[month_key] = monthly.get(month_key, 0) + income.get('amount', 0)
+            total_amount = stats['totalAmount']
+            avg_amount = total_amount / stats['count']
+            max_amount = stats['maxAmount']
+            min_amount = stats['minAmount']
+            sources = stats['bySource']
+            monthly = stats['byMonth']
             
             # FIXED: Return statistics in the format expected by IncomeStatistics.fromJson()
             statistics_data = {
                 'totals': {
-                    'count': len(incomes),
+                    'count': stats['count'],
                     'totalAmount': total_amount,
                     'averageAmount': avg_amount,
                     'maxAmount': max_amount,
@@ -797,12 +778,23 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
                 'message': 'Income statistics retrieved successfully'
             })
             
-        except Exception as e:
-            print(f"Error in get_income_statistics: {e}")
+        except ExecutionTimeout:
+            logger.warning(f"Income statistics query timed out for user {current_user['_id']}")
             return jsonify({
                 'success': False,
-                'message': 'Failed to retrieve income statistics',
-                'errors': {'general': [str(e)]}
+                'message': 'Query timed out'
+            }), 504
+        except OperationFailure as e:
+            logger.warning(f"Income statistics query failed for user {current_user['_id']}: code={e.code}")
+            return jsonify({
+                'success': False,
+                'message': 'Failed to retrieve income statistics'
+            }), 500
+        except Exception:
+            logger.exception(f"Error in get_income_statistics for user {current_user['_id']}")
+            return jsonify({
+                'success': False,
+                'message': 'Failed to retrieve income statistics'
             }), 500
             incomes = list(mongo.db.incomes.find({
                 'userId': current_user['_id'],
@@ -928,23 +920,18 @@ def init_income_blueprint(mongo, token_required, serialize_doc):
                 query['dateReceived'] = date_query
             
             # Get incomes and calculate source totals
-            incomes = list(mongo.db.incomes.find(query))
             source_totals = {}
-            sources = set()
-            
-            for income in incomes:
+            for income in mongo.db.incomes.find(query, {'source': 1, 'amount': 1}):
                 source = income.get('source', 'Unknown')
-                sources.add(source)
                 source_totals[source] = source_totals.get(source, 0) + income.get('amount', 0)
             
             # Default sources if none exist
-            if not sources:
+            if not source_totals:
                 default_sources = {
                     'Salary', 'Business Revenue', 'Freelance', 'Investment Returns',
                     'Rental Income', 'Commission', 'Bonus', 'Gift', 'Refund',
                     'Side Hustle', 'Consulting', 'Royalties', 'Other'
                 }
-                sources = default_sources
                 # Set all default sources to 0
                 for source in default_sources:
                     source_totals[source] = 0.0
@@ -1,98 +1,441 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from datetime import datetime, timedelta
 from bson import ObjectId
+import json
+import logging
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from utils.enhanced_cache import enhanced_cache
+from utils.background_tasks import background_tasks
+
+logger = logging.getLogger(__name__)
+
+def _parse_oid(value):
+    """Parse an ObjectId from request input, returning None if it is not a valid id"""
+    return ObjectId(value) if ObjectId.is_valid(value) else None
+
+def _clean_str(data, key):
+    """Get a stripped string field from request data, or None if it is missing or blank"""
+    value = data.get(key)
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+class _ItemMissingError(Exception):
+    """Raised inside a write to abort its transaction when the item no longer exists"""
 
 def init_inventory_blueprint(mongo, token_required, serialize_doc):
     """Initialize the inventory blueprint with database and auth decorator"""
     inventory_bp = Blueprint('inventory', __name__, url_prefix='/inventory')
 
-    def safe_date_format(date_value, default_to_now=False):
-        """Safely format datetime to ISO string, handling None values"""
-        if date_value is None:
-            return datetime.utcnow().isoformat() + 'Z' if default_to_now else None
+    # Summary polls are served from cache for a short window; writes invalidate it
+    SUMMARY_CACHE_TTL_SECONDS = 30
+    # Low stock and valuation reports are cached per query for a little longer
+    REPORT_CACHE_TTL_SECONDS = 45
+
+    # Users whose inventory_summary document has a rebuild queued
+    pending_summary_rebuilds = set()
+
+    def rebuild_inventory_summary(user_id):
+        """Recompute a user's inventory_summary document from their items"""
+        pending_summary_rebuilds.discard(user_id)
+        # Clear the stale flag before aggregating, so a write landing mid-rebuild marks it stale again
+        mongo.db.inventory_summary.update_one({'userId': user_id}, {'$set': {'stale': False}}, upsert=True)
+        summary_result = list(mongo.db.inventory_items.aggregate([
+            {'$match': {'userId': user_id}},
+            {'$group': {
+                '_id': None,
+                'totalItems': {'$sum': 1},
+                'activeItems': {'$sum': {'$cond': [{'$eq': ['$status', 'active']}, 1, 0]}},
+                'lowStockItems': {'$sum': {'$cond': [{'$lte': ['$currentStock', '$minimumStock']}, 1, 0]}},
+                'outOfStockItems': {'$sum': {'$cond': [{'$lte': ['$currentStock', 0]}, 1, 0]}},
+                'totalValue': {'$sum': {'$multiply': ['$currentStock', '$costPrice']}},
+                'totalStock': {'$sum': '$currentStock'}
+            }}
+        ]))
+        
+        summary_data = {
+            'totalItems': 0,
+            'activeItems': 0,
+            'lowStockItems': 0,
+            'outOfStockItems': 0,
+            'totalValue': 0,
+            'totalStock': 0
+        }
+        if summary_result:
+            summary_result[0].pop('_id', None)
+            summary_data.update(summary_result[0])
+        
+        mongo.db.inventory_summary.update_one(
+            {'userId': user_id},
+            {'$set': {**summary_data, 'updatedAt': datetime.utcnow()}},
+            upsert=True
+        )
+        # Reads cached while the rebuild was queued are stale now
+        enhanced_cache.invalidate_by_pattern('inventory_data', user_id)
+        return summary_data
+
+    def invalidate_inventory_cache(user_id):
+        """
+        Drop cached inventory reads for a user after a write and queue a summary rebuild.
+        The summary is marked stale in the database first, so a rebuild lost with the queue
+        is still done on the next summary read.
+        """
+        mongo.db.inventory_summary.update_one({'userId': user_id}, {'$set': {'stale': True}})
+        enhanced_cache.invalidate_by_pattern('inventory_data', user_id)
+        if user_id not in pending_summary_rebuilds:
+            pending_summary_rebuilds.add(user_id)
+            background_tasks.submit(rebuild_inventory_summary, user_id)
+
+    def safe_date_format(date_value, default_to_now=False, now=None):
+        """
+        Safely format datetime to ISO string, handling None values.
+        Pass the request's now when formatting many rows so missing dates share one clock read.
+        """
         try:
             return date_value.isoformat() + 'Z'
         except (AttributeError, TypeError):
-            return datetime.utcnow().isoformat() + 'Z' if default_to_now else None
+            if not default_to_now:
+                return None
+            return (now or datetime.utcnow()).isoformat() + 'Z'
+
+    def format_item_dates(item_data, now=None):
+        """Format an item's timestamps as ISO strings in place"""
+        for field in ('createdAt', 'updatedAt'):
+            item_data[field] = safe_date_format(item_data.get(field), default_to_now=True, now=now)
+        item_data['lastRestocked'] = safe_date_format(item_data.get('lastRestocked'))
+        return item_data
+
+    def format_movement_dates(movement_data, now=None):
+        """Format a movement's timestamps as ISO strings in place"""
+        for field in ('movementDate', 'createdAt'):
+            movement_data[field] = safe_date_format(movement_data.get(field), default_to_now=True, now=now)
+        return movement_data
+
+    # Largest page size the listing endpoints will serve
+    MAX_PAGE_LIMIT = 100
 
-    def update_item_stock(item_id, user_id):
-        """Update item stock based on movements"""
+    def parse_pagination(default_limit):
+        """
+        Parse the page and limit query args, capping limit at MAX_PAGE_LIMIT.
+        Returns (page, limit, None) on success or (None, None, (field, message)) for invalid input.
+        """
         try:
-            # Get all movements for this item
-            movements = list(mongo.db.inventory_movements.find({
-                'itemId': item_id,
-                'userId': user_id
-            }).sort('movementDate', 1))
-            
-            current_stock = 0
-            for movement in movements:
-                if movement['movementType'] in ['in', 'adjustment']:
-                    current_stock += movement['quantity']
-                elif movement['movementType'] in ['out']:
-                    current_stock -= abs(movement['quantity'])
-            
-            # Update item stock
-            item = mongo.db.inventory_items.find_one({'_id': item_id})
-            if not item:
-                return False
-            
-            # Determine status based on stock level
-            status = 'active'
-            if current_stock <= 0:
-                status = 'out_of_stock'
-            elif current_stock <= item.get('minimumStock', 0):
-                status = 'low_stock'
-            
-            mongo.db.inventory_items.update_one(
-                {'_id': item_id},
-                {
-                    '$set': {
-                        'currentStock': current_stock,
-                        'status': status,
-                        'updatedAt': datetime.utcnow()
-                    }
-                }
+            page = int(request.args.get('page') or 1)
+        except ValueError:
+            return None, None, ('page', 'Page must be a positive integer')
+        try:
+            limit = int(request.args.get('limit') or default_limit)
+        except ValueError:
+            return None, None, ('limit', 'Limit must be a positive integer')
+        if page < 1:
+            return None, None, ('page', 'Page must be a positive integer')
+        if limit < 1:
+            return None, None, ('limit', 'Limit must be a positive integer')
+        return page, min(limit, MAX_PAGE_LIMIT), None
+
+    def parse_movement_cursor(cursor):
+        """Parse a '<movementDate ISO>_<movement id>' listing cursor, returning None if it is malformed"""
+        date_part, _, id_part = cursor.rpartition('_')
+        movement_id = _parse_oid(id_part)
+        try:
+            movement_date = datetime.fromisoformat(date_part.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        if movement_id is None:
+            return None
+        return movement_date, movement_id
+
+    # Pipeline stage doing format_movement_dates server-side for movement listings
+    MOVEMENT_DATES_STAGE = {'$addFields': {
+        'movementDate': {'$dateToString': {
+            'format': '%Y-%m-%dT%H:%M:%S.%LZ', 'date': {'$ifNull': ['$movementDate', '$$NOW']}
+        }},
+        'createdAt': {'$dateToString': {
+            'format': '%Y-%m-%dT%H:%M:%S.%LZ', 'date': {'$ifNull': ['$createdAt', '$$NOW']}
+        }}
+    }}
+
+    # Pipeline stage doing format_item_dates server-side for item listings
+    ITEM_DATES_STAGE = {'$addFields': {
+        'createdAt': {'$dateToString': {
+            'format': '%Y-%m-%dT%H:%M:%S.%LZ', 'date': {'$ifNull': ['$createdAt', '$$NOW']}
+        }},
+        'updatedAt': {'$dateToString': {
+            'format': '%Y-%m-%dT%H:%M:%S.%LZ', 'date': {'$ifNull': ['$updatedAt', '$$NOW']}
+        }},
+        'lastRestocked': {'$dateToString': {
+            'format': '%Y-%m-%dT%H:%M:%S.%LZ', 'date': '$lastRestocked', 'onNull': None
+        }}
+    }}
+
+    # Item fields a listing can narrow itself to with ?fields=
+    LISTABLE_ITEM_FIELDS = {
+        'itemName', 'itemCode', 'description', 'category', 'costPrice', 'sellingPrice',
+        'currentStock', 'minimumStock', 'maximumStock', 'isLowStock', 'profitMargin', 'unit',
+        'supplier', 'location', 'status', 'lastRestocked', 'expiryDate', 'tags', 'images',
+        'notes', 'createdAt', 'updatedAt'
+    }
+
+    # Item fields the movement and stock operation endpoints read
+    MOVEMENT_ITEM_PROJECTION = {'itemName': 1, 'itemCode': 1, 'unit': 1, 'currentStock': 1, 'costPrice': 1}
+
+    # Item fields the valuation report reads
+    VALUATION_ITEM_PROJECTION = {
+        'itemName': 1, 'itemCode': 1, 'category': 1, 'currentStock': 1,
+        'unit': 1, 'costPrice': 1, 'sellingPrice': 1
+    }
+
+    # Joined item fields the movement history report reads
+    HISTORY_ITEM_PROJECTION = {'itemName': 1, 'itemCode': 1, 'category': 1, 'unit': 1}
+
+    # Movement fields copied into each movement history row: (field, default when missing)
+    HISTORY_MOVEMENT_FIELDS = (
+        ('quantity', 0), ('unitCost', 0), ('totalCost', 0), ('reason', None), ('reference', None),
+        ('stockBefore', 0), ('stockAfter', 0), ('notes', None)
+    )
+
+    # Extra movement history fields per movement type
+    HISTORY_TYPE_FIELDS = {
+        'in': ('supplier', 'purchaseOrder'),
+        'out': ('customer', 'salesOrder', 'sellingPrice'),
+        'adjustment': ('adjustmentQuantity', 'adjustedBy'),
+    }
+
+    # Numeric fields accepted by PUT /items/<id>: field -> (type, label, nullable)
+    ITEM_UPDATE_NUMERIC_FIELDS = {
+        'costPrice': (float, 'Cost price', False),
+        'sellingPrice': (float, 'Selling price', False),
+        'minimumStock': (int, 'Minimum stock', False),
+        'maximumStock': (int, 'Maximum stock', True),
+    }
+
+    # Numeric fields accepted by stock in movements
+    STOCK_IN_NUMERIC_FIELDS = {
+        'unitCost': (float, 'Unit cost', False),
+    }
+
+    def parse_numeric_fields(data, field_specs):
+        """
+        Parse the non-negative numeric fields present in data using a field spec table.
+        Returns (values, None) on success or (None, (field, message, detail)) for the first invalid field.
+        """
+        values = {}
+        for field, (field_type, label, nullable) in field_specs.items():
+            if field not in data:
+                continue
+            if data[field] is None and nullable:
+                values[field] = None
+                continue
+            try:
+                value = field_type(data[field])
+            except (ValueError, TypeError):
+                return None, (field, f'Invalid {label.lower()} format', f'{label} must be a valid number')
+            if value < 0:
+                return None, (field, f'{label} must be non-negative', f'{label} must be non-negative')
+            values[field] = value
+        return values, None
+
+    def calculate_profit_margin(cost_price, selling_price):
+        """Profit margin as a percentage of selling price, rounded to 2 decimals"""
+        if selling_price > 0:
+            return round(((selling_price - cost_price) / selling_price) * 100, 2)
+        return 0
+
+    # Item stock levels and prices, plus the fields derived from them
+    DERIVED_FIELDS_PROJECTION = {
+        'currentStock': 1, 'minimumStock': 1, 'costPrice': 1, 'sellingPrice': 1,
+        'status': 1, 'isLowStock': 1, 'profitMargin': 1
+    }
+
+    # Item status and low stock flag as update pipeline expressions
+    STOCK_STATUS_FIELDS = {
+        'status': {'$switch': {
+            'branches': [
+                {'case': {'$lte': ['$currentStock', 0]}, 'then': 'out_of_stock'},
+                {'case': {'$lte': ['$currentStock', {'$ifNull': ['$minimumStock', 0]}]}, 'then': 'low_stock'}
+            ],
+            'default': 'active'
+        }},
+        'isLowStock': {'$lte': ['$currentStock', {'$ifNull': ['$minimumStock', 0]}]}
+    }
+
+    # STOCK_STATUS_FIELDS plus calculate_profit_margin as update pipeline expressions
+    DERIVED_FIELDS = {
+        **STOCK_STATUS_FIELDS,
+        'profitMargin': {'$cond': [
+            {'$gt': ['$sellingPrice', 0]},
+            {'$round': [{'$multiply': [
+                {'$divide': [{'$subtract': ['$sellingPrice', '$costPrice']}, '$sellingPrice']}, 100
+            ]}, 2]},
+            0
+        ]}
+    }
+
+    def stock_update_pipeline(stock_fields):
+        """Update pipeline that sets stock_fields, then derives status and isLowStock from the result"""
+        return [{'$set': stock_fields}, {'$set': STOCK_STATUS_FIELDS}]
+
+    def stock_delta_expression(signed_qty):
+        """Pipeline expression moving the stored stock level by signed_qty, like $inc"""
+        return {'$add': [{'$ifNull': ['$currentStock', 0]}, signed_qty]}
+
+    def write_item_stock(item_id, user_id, stock_fields):
+        """Set an item's stock fields and its status in a single write"""
+        try:
+            result = mongo.db.inventory_items.update_one(
+                {'_id': item_id, 'userId': user_id},
+                stock_update_pipeline({**stock_fields, 'updatedAt': datetime.utcnow()})
             )
+            if not result.matched_count:
+                return False
             
+            invalidate_inventory_cache(user_id)
             return True
             
-        except Exception as e:
-            print(f"Error updating item stock: {str(e)}")
+        except Exception:
+            logger.exception(f"Error updating item stock for item {item_id}")
             return False
 
-    def create_cogs_expense(item_id, quantity_sold, user_id):
-        """Create COGS expense when inventory is sold"""
+    def apply_movement_delta(item_id, user_id, signed_qty, extra_set=None):
+        """Apply a single movement's signed quantity to item stock and refresh its status.
+        extra_set holds any other item fields to set in the same update."""
+        # Atomically move the stock level by the new movement only
+        return write_item_stock(item_id, user_id, {
+            'currentStock': stock_delta_expression(signed_qty),
+            **(extra_set or {})
+        })
+
+    def set_item_stock_level(item_id, user_id, stock_level):
+        """Set item stock to the counted level an adjustment records and refresh its status"""
+        return write_item_stock(item_id, user_id, {'currentStock': stock_level})
+
+    def reconcile_item_stock(item_id, user_id):
+        """Recompute item stock from its full movement history and store it"""
+        # Sum the signed movements server-side; adjustments contribute the change they made
+        result = list(mongo.db.inventory_movements.aggregate([
+            {'$match': {'itemId': item_id, 'userId': user_id}},
+            {'$group': {
+                '_id': None,
+                'stock': {'$sum': {'$switch': {
+                    'branches': [
+                        {'case': {'$eq': ['$movementType', 'in']}, 'then': {'$abs': '$quantity'}},
+                        {'case': {'$eq': ['$movementType', 'out']}, 'then': {'$multiply': [-1, {'$abs': '$quantity'}]}},
+                        {'case': {'$eq': ['$movementType', 'adjustment']},
+                         'then': {'$subtract': ['$stockAfter', '$stockBefore']}}
+                    ],
+                    'default': 0
+                }}}
+            }}
+        ]))
+        stock = result[0]['stock'] if result else 0
+        
+        # Store the stock and derive its status from the stored minimumStock in the same write
+        item = mongo.db.inventory_items.find_one_and_update(
+            {'_id': item_id, 'userId': user_id},
+            stock_update_pipeline({'currentStock': stock, 'updatedAt': datetime.utcnow()}),
+            projection=DERIVED_FIELDS_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if not item:
+            return None
+        
+        invalidate_inventory_cache(user_id)
+        return item
+
+    def build_cogs_expense(item, quantity_sold, user_id, now):
+        """Build the COGS expense record for an inventory sale from the already-loaded item,
+        dated with the sale's timestamp"""
+        cogs_amount = item['costPrice'] * quantity_sold
+        
+        return {
+            '_id': ObjectId(),
+            'userId': user_id,
+            'amount': cogs_amount,
+            'title': f"COGS - {item['itemName']}",
+            'description': f"Cost of Goods Sold for {quantity_sold} units of {item['itemName']}",
+            'category': 'Cost of Goods Sold',
+            'date': now,
+            'tags': ['COGS', 'Inventory', 'Auto-generated'],
+            'paymentMethod': 'inventory',
+            'notes': f"Auto-generated COGS expense for inventory sale. Item: {item['itemName']}, Quantity: {quantity_sold}, Unit Cost: {item['costPrice']}",
+            'createdAt': now,
+            'updatedAt': now
+        }
+
+    # Movement counters are recounted from the movements once they are this old, so any drift is bounded
+    MOVEMENT_COUNT_RECOUNT_SECONDS = 24 * 60 * 60
+
+    def adjust_movement_count(user_id, delta, session=None):
+        """
+        Keep the user's movement_counts document in step with inserts and deletes.
+        Only existing counters are moved; a missing counter is created by a recount on the next listing.
+        """
+        mongo.db.movement_counts.update_one(
+            {'userId': user_id},
+            {'$inc': {'count': delta}},
+            session=session
+        )
+
+    def insert_movement(movement_data, session=None):
+        """
+        Insert a stock movement and count it, in a transaction of its own when the caller has none open.
+        insert_one sets movement_data['_id'] in place.
+        """
+        def write_movement(write_session):
+            result = mongo.db.inventory_movements.insert_one(movement_data, session=write_session)
+            adjust_movement_count(movement_data['userId'], 1, write_session)
+            return result
+        
+        if session is None:
+            return run_transaction(write_movement)
+        return write_movement(session)
+
+    # Whether the server can run multi-document transactions, checked once on first use
+    transaction_support = {}
+
+    def supports_transactions():
+        """Transactions need a replica set or mongos; a standalone mongod rejects them"""
+        if 'enabled' not in transaction_support:
+            hello = mongo.db.client.admin.command('hello')
+            transaction_support['enabled'] = bool(hello.get('setName')) or hello.get('msg') == 'isdbgrid'
+            if not transaction_support['enabled']:
+                logger.warning("MongoDB is a standalone server; inventory writes will run without transactions")
+        return transaction_support['enabled']
+
+    def run_transaction(write):
+        """Run write(session) in a transaction where the server supports one.
+        On a standalone server its writes run in order without a session."""
+        if not supports_transactions():
+            return write(None)
+        with mongo.db.client.start_session() as session:
+            return session.with_transaction(write)
+
+    def insert_sale_movement(movement_data, expense_data, signed_qty):
+        """Insert an outgoing movement, its COGS expense and the stock decrement in one transaction.
+        Returns False without recording the sale if the item no longer exists."""
+        def write_sale(session):
+            # Decrement first, so a sale of an item deleted meanwhile writes nothing
+            result = mongo.db.inventory_items.update_one(
+                {'_id': movement_data['itemId'], 'userId': movement_data['userId']},
+                stock_update_pipeline({
+                    'currentStock': stock_delta_expression(signed_qty),
+                    'updatedAt': movement_data['createdAt']
+                }),
+                session=session
+            )
+            if not result.matched_count:
+                raise _ItemMissingError()
+            insert_movement(movement_data, session)
+            mongo.db.expenses.insert_one(expense_data, session=session)
+        
         try:
-            # Get item details
-            item = mongo.db.inventory_items.find_one({'_id': item_id})
-            if not item:
-                return False
-            
-            # Calculate COGS
-            cogs_amount = item['costPrice'] * quantity_sold
-            
-            # Create expense record for COGS
-            expense_data = {
-                '_id': ObjectId(),
-                'userId': user_id,
-                'amount': cogs_amount,
-                'title': f"COGS - {item['itemName']}",
-                'description': f"Cost of Goods Sold for {quantity_sold} units of {item['itemName']}",
-                'category': 'Cost of Goods Sold',
-                'date': datetime.utcnow(),
-                'tags': ['COGS', 'Inventory', 'Auto-generated'],
-                'paymentMethod': 'inventory',
-                'notes': f"Auto-generated COGS expense for inventory sale. Item: {item['itemName']}, Quantity: {quantity_sold}, Unit Cost: {item['costPrice']}",
-                'createdAt': datetime.utcnow(),
-                'updatedAt': datetime.utcnow()
-            }
-            
-            mongo.db.expenses.insert_one(expense_data)
-            return True
-            
-        except Exception as e:
-            print(f"Error creating COGS expense: {str(e)}")
+            run_transaction(write_sale)
+        except _ItemMissingError:
             return False
+        
+        invalidate_inventory_cache(movement_data['userId'])
+        return True
 
     # ==================== MAIN INVENTORY ENDPOINT ====================
 
@@ -103,28 +446,30 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
         try:
             user_id = current_user['_id']
             
-            # Get all inventory items
-            items = list(mongo.db.inventory_items.find({'userId': user_id}))
-            
-            # Calculate overview statistics
-            total_items = len(items)
-            total_stock = sum(item.get('currentStock', 0) for item in items)
-            total_value = sum(item.get('currentStock', 0) * item.get('unitPrice', 0) for item in items)
-            
-            # Get low stock items (where current stock <= minimum stock level)
-            low_stock_items = [
-                item for item in items 
-                if item.get('currentStock', 0) <= item.get('minimumStockLevel', 0)
-            ]
-            low_stock_count = len(low_stock_items)
-            
-            # Get out of stock items
-            out_of_stock_items = [item for item in items if item.get('currentStock', 0) == 0]
-            out_of_stock_count = len(out_of_stock_items)
+            # Get inventory items - only the fields the overview reads
+            items = mongo.db.inventory_items.find(
+                {'userId': user_id},
+                {'_id': 0, 'currentStock': 1, 'unitPrice': 1, 'minimumStockLevel': 1, 'status': 1}
+            )
             
-            # Get active items
-            active_items = [item for item in items if item.get('status') == 'active']
-            active_count = len(active_items)
+            # Calculate overview statistics in a single pass
+            total_items = 0
+            total_stock = 0
+            total_value = 0
+            low_stock_count = 0  # current stock <= minimum stock level
+            out_of_stock_count = 0
+            active_count = 0
+            for item in items:
+                current_stock = item.get('currentStock', 0)
+                total_items += 1
+                total_stock += current_stock
+                total_value += current_stock * item.get('unitPrice', 0)
+                if current_stock <= item.get('minimumStockLevel', 0):
+                    low_stock_count += 1
+                if current_stock == 0:
+                    out_of_stock_count += 1
+                if item.get('status') == 'active':
+                    active_count += 1
             
             # Get recent movements
             recent_movements = list(mongo.db.inventory_movements.find({
@@ -157,7 +502,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             }), 200
             
         except Exception as e:
-            print(f"Error getting inventory overview: {str(e)}")
+            logger.exception(f"Error getting inventory overview for user {current_user['_id']}")
             return jsonify({
                 'success': False,
                 'message': 'Failed to retrieve inventory overview',
@@ -171,6 +516,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
     def add_item(current_user):
         """Add a new inventory item"""
         try:
+            now = datetime.utcnow()
             data = request.get_json()
             
             # Validate required fields with proper null/empty checks
@@ -184,19 +530,6 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                         'errors': {field: [f'{field} is required']}
                     }), 400
             
-            # Check if item already exists
-            existing_item = mongo.db.inventory_items.find_one({
-                'userId': current_user['_id'],
-                'itemName': data['itemName']
-            })
-            
-            if existing_item:
-                return jsonify({
-                    'success': False,
-                    'message': 'Item with this name already exists',
-                    'errors': {'itemName': ['Item already exists']}
-                }), 400
-            
             # Validate numeric fields with proper error handling
             try:
                 cost_price = float(data.get('costPrice', 0))
@@ -245,35 +578,35 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 '_id': ObjectId(),
                 'userId': current_user['_id'],
                 'itemName': data['itemName'].strip(),
-                'itemCode': data.get('itemCode', '').strip() or None,
-                'description': data.get('description', '').strip() or None,
+                'itemCode': _clean_str(data, 'itemCode'),
+                'description': _clean_str(data, 'description'),
                 'category': data['category'].strip(),
                 'costPrice': cost_price,
                 'sellingPrice': selling_price,
                 'currentStock': current_stock,
                 'minimumStock': minimum_stock,
                 'maximumStock': maximum_stock,
+                'isLowStock': current_stock <= minimum_stock,
+                'profitMargin': calculate_profit_margin(cost_price, selling_price),
                 'unit': data['unit'].strip(),
-                'supplier': data.get('supplier', '').strip() or None,
-                'location': data.get('location', '').strip() or None,
+                'supplier': _clean_str(data, 'supplier'),
+                'location': _clean_str(data, 'location'),
                 'status': status,
-                'lastRestocked': datetime.utcnow() if current_stock > 0 else None,
+                'lastRestocked': now if current_stock > 0 else None,
                 'expiryDate': None,
                 'tags': data.get('tags', []) if isinstance(data.get('tags'), list) else [],
                 'images': data.get('images', []) if isinstance(data.get('images'), list) else [],
-                'notes': data.get('notes', '').strip() or None,
-                'createdAt': datetime.utcnow(),
-                'updatedAt': datetime.utcnow()
+                'notes': _clean_str(data, 'notes'),
+                'createdAt': now,
+                'updatedAt': now
             }
             
-            result = mongo.db.inventory_items.insert_one(item_data)
-            
             # Create initial stock movement if stock > 0
+            movement_data = None
             if current_stock > 0:
                 movement_data = {
-                    '_id': ObjectId(),
                     'userId': current_user['_id'],
-                    'itemId': result.inserted_id,
+                    'itemId': item_data['_id'],
                     'movementType': 'in',
                     'quantity': current_stock,
                     'unitCost': cost_price,
@@ -282,20 +615,33 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     'reference': 'Initial Stock Entry',
                     'stockBefore': 0,
                     'stockAfter': current_stock,
-                    'movementDate': datetime.utcnow(),
+                    'movementDate': now,
                     'notes': 'Initial stock entry when item was created',
-                    'createdAt': datetime.utcnow()
+                    'createdAt': now
                 }
-                mongo.db.inventory_movements.insert_one(movement_data)
             
-            # Return created item
-            created_item = mongo.db.inventory_items.find_one({'_id': result.inserted_id})
-            item_response = serialize_doc(created_item.copy())
+            def write_new_item(session):
+                mongo.db.inventory_items.insert_one(item_data, session=session)
+                if movement_data:
+                    insert_movement(movement_data, session)
+            
+            # Write the item and its opening movement in one transaction; duplicate names are
+            # rejected by the unique (userId, itemName) index before the movement is written
+            try:
+                run_transaction(write_new_item)
+            except DuplicateKeyError:
+                return jsonify({
+                    'success': False,
+                    'message': 'Item with this name already exists',
+                    'errors': {'itemName': ['Item already exists']}
+                }), 400
+            invalidate_inventory_cache(current_user['_id'])
+            
+            # Return created item - item_data already holds every stored field
+            item_response = serialize_doc(item_data)
             
-            # Format dates - Fix date serialization bug
-            item_response['createdAt'] = safe_date_format(item_response.get('createdAt'), default_to_now=True)
-            item_response['updatedAt'] = safe_date_format(item_response.get('updatedAt'), default_to_now=True)
-            item_response['lastRestocked'] = safe_date_format(item_response.get('lastRestocked'))
+            # Format dates
+            format_item_dates(item_response)
             
             return jsonify({
                 'success': True,
@@ -315,8 +661,14 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
     def get_items(current_user):
         """Get all inventory items with pagination and filtering"""
         try:
-            page = int(request.args.get('page', 1))
-            limit = int(request.args.get('limit', 10))
+            page, limit, page_error = parse_pagination(10)
+            if page_error:
+                field, message = page_error
+                return jsonify({
+                    'success': False,
+                    'message': message,
+                    'errors': {field: [message]}
+                }), 400
             category = request.args.get('category')
             status = request.args.get('status')
             search = request.args.get('search')
@@ -332,40 +684,92 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 query['status'] = status
             
             if low_stock_only:
-                query['$expr'] = {'$lte': ['$currentStock', '$minimumStock']}
+                query['isLowStock'] = True
             
             if search:
-                query['$or'] = [
-                    {'itemName': {'$regex': search, '$options': 'i'}},
-                    {'itemCode': {'$regex': search, '$options': 'i'}},
-                    {'description': {'$regex': search, '$options': 'i'}},
-                    {'supplier': {'$regex': search, '$options': 'i'}}
-                ]
-            
-            # Get items with pagination
-            skip = (page - 1) * limit
-            items = list(mongo.db.inventory_items.find(query).sort('itemName', 1).skip(skip).limit(limit))
-            total = mongo.db.inventory_items.count_documents(query)
-            
-            # Serialize items
-            item_list = []
-            for item in items:
-                item_data = serialize_doc(item.copy())
-                item_data['createdAt'] = safe_date_format(item_data.get('createdAt'), default_to_now=True)
-                item_data['updatedAt'] = safe_date_format(item_data.get('updatedAt'), default_to_now=True)
-                item_data['lastRestocked'] = safe_date_format(item_data.get('lastRestocked'))
+                # Served by the user_item_search_text index instead of scanning with $regex
+                query['$text'] = {'$search': search}
+            
+            # Deep pages can continue after the last item name instead of skipping;
+            # names are unique per user, so the name alone is a stable cursor
+            cursor_param = request.args.get('cursor')
+            if cursor_param:
+                query['itemName'] = {'$gt': cursor_param}
+                skip = 0
+            else:
+                skip = (page - 1) * limit
+            
+            # List views can ask for just the fields they show; itemName is always kept for the cursor.
+            # Otherwise images and notes are only returned by the item detail endpoint
+            fields_param = request.args.get('fields')
+            if fields_param:
+                fields = {field.strip() for field in fields_param.split(',') if field.strip()}
+                unknown_fields = sorted(fields - LISTABLE_ITEM_FIELDS)
+                if unknown_fields:
+                    return jsonify({
+                        'success': False,
+                        'message': 'Invalid fields',
+                        'errors': {'fields': [f"Unknown field: {field}" for field in unknown_fields]}
+                    }), 400
+                projection = {field: 1 for field in fields | {'itemName'}}
+                dates_stage = {'$addFields': {
+                    field: expression for field, expression in ITEM_DATES_STAGE['$addFields'].items()
+                    if field in projection
+                }}
+            else:
+                projection = {'images': 0, 'notes': 0}
+                dates_stage = ITEM_DATES_STAGE
+            
+            page_stages = [
+                {'$sort': {'itemName': 1}},
+                {'$skip': skip},
+                {'$limit': limit},
+                {'$project': projection}
+            ]
+            if dates_stage['$addFields']:
+                page_stages.append(dates_stage)
+            
+            # NDJSON clients get one item per line straight off the cursor, without a total count
+            stream = request.args.get('stream') == '1' or \
+                request.accept_mimetypes.best == 'application/x-ndjson'
+            if stream:
+                cursor = mongo.db.inventory_items.aggregate([{'$match': query}] + page_stages)
                 
-                # Calculate profit margin
-                if item['sellingPrice'] > 0:
-                    profit_margin = ((item['sellingPrice'] - item['costPrice']) / item['sellingPrice']) * 100
-                    item_data['profitMargin'] = round(profit_margin, 2)
-                else:
-                    item_data['profitMargin'] = 0
+                def generate_items():
+                    for item in cursor:
+                        yield json.dumps(serialize_doc(item), default=str) + '\n'
                 
-                # Check if item is low stock
-                item_data['isLowStock'] = item['currentStock'] <= item['minimumStock']
+                return Response(stream_with_context(generate_items()), mimetype='application/x-ndjson')
+            
+            if cursor_param:
+                # Cursor pages skip the total count, which would scan every match
+                item_list = [serialize_doc(item) for item in
+                             mongo.db.inventory_items.aggregate([{'$match': query}] + page_stages)]
                 
-                item_list.append(item_data)
+                return jsonify({
+                    'success': True,
+                    'data': item_list,
+                    'pagination': {
+                        'limit': limit,
+                        'nextCursor': item_list[-1]['itemName'] if len(item_list) == limit else None
+                    },
+                    'message': 'Items retrieved successfully'
+                })
+            
+            # Get the page and the total count in one round-trip
+            facet_result = list(mongo.db.inventory_items.aggregate([
+                {'$match': query},
+                {'$facet': {
+                    'items': page_stages,
+                    'meta': [{'$count': 'total'}]
+                }}
+            ]))
+            items = facet_result[0]['items'] if facet_result else []
+            meta = facet_result[0]['meta'] if facet_result else []
+            total = meta[0]['total'] if meta else 0
+            
+            # Dates are already ISO strings; serialize_doc only converts the ids
+            item_list = [serialize_doc(item) for item in items]
             
             return jsonify({
                 'success': True,
@@ -374,7 +778,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     'page': page,
                     'limit': limit,
                     'total': total,
-                    'pages': (total + limit - 1) // limit
+                    'pages': (total + limit - 1) // limit,
+                    'nextCursor': item_list[-1]['itemName'] if len(item_list) == limit else None
                 },
                 'message': 'Items retrieved successfully'
             })
@@ -391,6 +796,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
     def get_inventory_statistics(current_user):
         """Enhanced statistics endpoint with comprehensive metrics"""
         try:
+            now = datetime.utcnow()
             user_id = current_user['_id']
             
             # MongoDB aggregation pipeline for comprehensive stats
@@ -444,8 +850,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 'potentialProfit': potential_profit,
                 'profitMargin': round(profit_margin, 2),
                 'dateRange': {
-                    'startDate': datetime.utcnow().replace(day=1).isoformat() + 'Z',
-                    'endDate': datetime.utcnow().isoformat() + 'Z'
+                    'startDate': now.replace(day=1).isoformat() + 'Z',
+                    'endDate': now.isoformat() + 'Z'
                 }
             }
             
@@ -467,29 +873,24 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
     def get_summary(current_user):
         """Get inventory summary statistics"""
         try:
-            # Get all items
-            items = list(mongo.db.inventory_items.find({'userId': current_user['_id']}))
-            
-            # Calculate summary statistics
-            total_items = len(items)
-            total_value = sum(item['currentStock'] * item['costPrice'] for item in items)
-            low_stock_items = len([item for item in items if item['currentStock'] <= item['minimumStock']])
-            out_of_stock_items = len([item for item in items if item['currentStock'] <= 0])
-            
-            # Count by status
-            active_items = len([item for item in items if item.get('status') == 'active'])
+            cached_summary = enhanced_cache.get(current_user['_id'], 'inventory_summary')
+            if cached_summary is not None:
+                return jsonify({
+                    'success': True,
+                    'data': cached_summary,
+                    'message': 'Summary retrieved successfully'
+                })
             
-            # Calculate total stock quantity
-            total_stock = sum(item['currentStock'] for item in items)
+            # Read the maintained summary document, rebuilding it on first use or after an unapplied write
+            summary_data = mongo.db.inventory_summary.find_one(
+                {'userId': current_user['_id']},
+                {'_id': 0, 'userId': 0, 'updatedAt': 0}
+            )
+            if summary_data is None or summary_data.pop('stale', False):
+                summary_data = rebuild_inventory_summary(current_user['_id'])
             
-            summary_data = {
-                'totalItems': total_items,
-                'activeItems': active_items,
-                'lowStockItems': low_stock_items,
-                'outOfStockItems': out_of_stock_items,
-                'totalValue': total_value,
-                'totalStock': total_stock
-            }
+            enhanced_cache.set(current_user['_id'], 'inventory_summary', summary_data,
+                               ttl_seconds=SUMMARY_CACHE_TTL_SECONDS)
             
             return jsonify({
                 'success': True,
@@ -512,9 +913,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
         """Get specific item details"""
         try:
             # Validate ObjectId
-            try:
-                item_object_id = ObjectId(item_id)
-            except:
+            item_object_id = _parse_oid(item_id)
+            if item_object_id is None:
                 return jsonify({
                     'success': False,
                     'message': 'Invalid item ID format',
@@ -535,20 +935,9 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 }), 404
             
             # Serialize item
-            item_data = serialize_doc(item.copy())
-            item_data['createdAt'] = safe_date_format(item_data.get('createdAt'), default_to_now=True)
-            item_data['updatedAt'] = safe_date_format(item_data.get('updatedAt'), default_to_now=True)
-            item_data['lastRestocked'] = safe_date_format(item_data.get('lastRestocked'))
-            
-            # Calculate profit margin
-            if item['sellingPrice'] > 0:
-                profit_margin = ((item['sellingPrice'] - item['costPrice']) / item['sellingPrice']) * 100
-                item_data['profitMargin'] = round(profit_margin, 2)
-            else:
-                item_data['profitMargin'] = 0
-            
-            # Check if item is low stock
-            item_data['isLowStock'] = item['currentStock'] <= item['minimumStock']
+            now = datetime.utcnow()
+            item_data = serialize_doc(item)
+            format_item_dates(item_data, now)
             
             # Get recent movements for this item
             recent_movements = list(mongo.db.inventory_movements.find({
@@ -558,9 +947,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             
             movements_data = []
             for movement in recent_movements:
-                movement_data = serialize_doc(movement.copy())
-                movement_data['movementDate'] = safe_date_format(movement_data.get('movementDate'), default_to_now=True)
-                movement_data['createdAt'] = safe_date_format(movement_data.get('createdAt'), default_to_now=True)
+                movement_data = serialize_doc(movement)
+                format_movement_dates(movement_data, now)
                 movements_data.append(movement_data)
             
             item_data['recentMovements'] = movements_data
@@ -584,28 +972,14 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
         """Update specific item"""
         try:
             # Validate ObjectId
-            try:
-                item_object_id = ObjectId(item_id)
-            except:
+            item_object_id = _parse_oid(item_id)
+            if item_object_id is None:
                 return jsonify({
                     'success': False,
                     'message': 'Invalid item ID format',
                     'errors': {'itemId': ['Invalid item ID format']}
                 }), 400
             
-            # Check if item exists
-            existing_item = mongo.db.inventory_items.find_one({
-                '_id': item_object_id,
-                'userId': current_user['_id']
-            })
-            
-            if not existing_item:
-                return jsonify({
-                    'success': False,
-                    'message': 'Item not found',
-                    'errors': {'itemId': ['Item not found']}
-                }), 404
-            
             data = request.get_json()
             
             # Validate required fields if provided
@@ -616,95 +990,15 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     'errors': {'itemName': ['Item name is required']}
                 }), 400
             
-            # Check for duplicate name if name is being changed
-            if 'itemName' in data and data['itemName'] != existing_item['itemName']:
-                duplicate_item = mongo.db.inventory_items.find_one({
-                    'userId': current_user['_id'],
-                    'itemName': data['itemName'],
-                    '_id': {'$ne': item_object_id}
-                })
-                
-                if duplicate_item:
-                    return jsonify({
-                        'success': False,
-                        'message': 'Item with this name already exists',
-                        'errors': {'itemName': ['Item name already exists']}
-                    }), 400
-            
             # Validate numeric fields
-            update_data = {}
-            
-            if 'costPrice' in data:
-                try:
-                    cost_price = float(data['costPrice'])
-                    if cost_price < 0:
-                        return jsonify({
-                            'success': False,
-                            'message': 'Cost price must be non-negative',
-                            'errors': {'costPrice': ['Cost price must be non-negative']}
-                        }), 400
-                    update_data['costPrice'] = cost_price
-                except (ValueError, TypeError):
-                    return jsonify({
-                        'success': False,
-                        'message': 'Invalid cost price format',
-                        'errors': {'costPrice': ['Cost price must be a valid number']}
-                    }), 400
-            
-            if 'sellingPrice' in data:
-                try:
-                    selling_price = float(data['sellingPrice'])
-                    if selling_price < 0:
-                        return jsonify({
-                            'success': False,
-                            'message': 'Selling price must be non-negative',
-                            'errors': {'sellingPrice': ['Selling price must be non-negative']}
-                        }), 400
-                    update_data['sellingPrice'] = selling_price
-                except (ValueError, TypeError):
-                    return jsonify({
-                        'success': False,
-                        'message': 'Invalid selling price format',
-                        'errors': {'sellingPrice': ['Selling price must be a valid number']}
-                    }), 400
-            
-            # Validate stock levels
-            if 'minimumStock' in data:
-                try:
-                    minimum_stock = int(data['minimumStock'])
-                    if minimum_stock < 0:
-                        return jsonify({
-                            'success': False,
-                            'message': 'Minimum stock must be non-negative',
-                            'errors': {'minimumStock': ['Minimum stock must be non-negative']}
-                        }), 400
-                    update_data['minimumStock'] = minimum_stock
-                except (ValueError, TypeError):
-                    return jsonify({
-                        'success': False,
-                        'message': 'Invalid minimum stock format',
-                        'errors': {'minimumStock': ['Minimum stock must be a valid number']}
-                    }), 400
-            
-            if 'maximumStock' in data:
-                if data['maximumStock'] is not None:
-                    try:
-                        maximum_stock = int(data['maximumStock'])
-                        if maximum_stock < 0:
-                            return jsonify({
-                                'success': False,
-                                'message': 'Maximum stock must be non-negative',
-                                'errors': {'maximumStock': ['Maximum stock must be non-negative']}
-                            }), 400
-                        update_data['maximumStock'] = maximum_stock
-                    except (ValueError, TypeError):
-                        return jsonify({
-                            'success': False,
-                            'message': 'Invalid maximum stock format',
-                            'errors': {'maximumStock': ['Maximum stock must be a valid number']}
-                        }), 400
-                else:
-                    update_data['maximumStock'] = None
+            update_data, field_error = parse_numeric_fields(data, ITEM_UPDATE_NUMERIC_FIELDS)
+            if field_error:
+                field, message, detail = field_error
+                return jsonify({
+                    'success': False,
+                    'message': message,
+                    'errors': {field: [detail]}
+                }), 400
             
             # Update other fields
             updatable_fields = ['itemName', 'itemCode', 'description', 'category', 'unit', 'supplier', 'location', 'tags', 'images', 'notes']
@@ -718,24 +1012,44 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             # Update timestamp
             update_data['updatedAt'] = datetime.utcnow()
             
-            # Update item
-            mongo.db.inventory_items.update_one(
-                {'_id': item_object_id},
-                {'$set': update_data}
-            )
+            # Recalculate status and profit margin in the same write if stock levels or prices changed,
+            # from the stored document so a concurrent stock movement is never overwritten
+            if any(field in update_data for field in ('minimumStock', 'costPrice', 'sellingPrice')):
+                update = [
+                    {'$set': {field: {'$literal': value} for field, value in update_data.items()}},
+                    {'$set': DERIVED_FIELDS}
+                ]
+            else:
+                update = {'$set': update_data}
             
-            # Recalculate status if minimum stock changed
-            if 'minimumStock' in update_data:
-                update_item_stock(item_object_id, current_user['_id'])
+            # Update item - the ownership filter doubles as the existence check
+            # and renames onto an existing item are rejected by the unique index
+            try:
+                updated_item = mongo.db.inventory_items.find_one_and_update(
+                    {'_id': item_object_id, 'userId': current_user['_id']},
+                    update,
+                    return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                return jsonify({
+                    'success': False,
+                    'message': 'Item with this name already exists',
+                    'errors': {'itemName': ['Item name already exists']}
+                }), 400
             
-            # Get updated item
-            updated_item = mongo.db.inventory_items.find_one({'_id': item_object_id})
-            item_response = serialize_doc(updated_item.copy())
+            if not updated_item:
+                return jsonify({
+                    'success': False,
+                    'message': 'Item not found',
+                    'errors': {'itemId': ['Item not found']}
+                }), 404
             
-            # Format dates - Fix date serialization bug
-            item_response['createdAt'] = safe_date_format(item_response.get('createdAt'), default_to_now=True)
-            item_response['updatedAt'] = safe_date_format(item_response.get('updatedAt'), default_to_now=True)
-            item_response['lastRestocked'] = safe_date_format(item_response.get('lastRestocked'))
+            invalidate_inventory_cache(current_user['_id'])
+            
+            item_response = serialize_doc(updated_item)
+            
+            # Format dates
+            format_item_dates(item_response)
             
             return jsonify({
                 'success': True,
@@ -756,58 +1070,56 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
         """Delete specific item with safety checks"""
         try:
             # Validate ObjectId
-            try:
-                item_object_id = ObjectId(item_id)
-            except:
+            item_object_id = _parse_oid(item_id)
+            if item_object_id is None:
                 return jsonify({
                     'success': False,
                     'message': 'Invalid item ID format',
                     'errors': {'itemId': ['Invalid item ID format']}
                 }), 400
             
-            # Check if item exists
-            item = mongo.db.inventory_items.find_one({
-                '_id': item_object_id,
-                'userId': current_user['_id']
-            })
+            item_filter = {'_id': item_object_id, 'userId': current_user['_id']}
+            movements_filter = {'itemId': item_object_id, 'userId': current_user['_id']}
+            force_delete = request.args.get('force', '').lower() == 'true'
             
-            if not item:
+            if force_delete:
+                # Delete the item and its movements atomically where the server supports transactions
+                def delete_with_movements(session):
+                    if not mongo.db.inventory_items.delete_one(item_filter, session=session).deleted_count:
+                        return None
+                    deleted_count = mongo.db.inventory_movements.delete_many(movements_filter, session=session).deleted_count
+                    if deleted_count:
+                        adjust_movement_count(current_user['_id'], -deleted_count, session)
+                    return deleted_count
+                
+                deleted_movements = run_transaction(delete_with_movements)
+                item_deleted = deleted_movements is not None
+            else:
+                # Check if item has movements (safety check)
+                if mongo.db.inventory_movements.find_one(movements_filter, {'_id': 1}):
+                    return jsonify({
+                        'success': False,
+                        'message': 'Cannot delete item with existing movements. Use force=true to override.',
+                        'errors': {'movements': ['Item has existing movements']},
+                        'data': {'movementsCount': mongo.db.inventory_movements.count_documents(movements_filter)}
+                    }), 400
+                
+                deleted_movements = 0
+                item_deleted = mongo.db.inventory_items.delete_one(item_filter).deleted_count > 0
+            
+            if not item_deleted:
                 return jsonify({
                     'success': False,
                     'message': 'Item not found',
                     'errors': {'itemId': ['Item not found']}
                 }), 404
             
-            # Check if item has movements (safety check)
-            movements_count = mongo.db.inventory_movements.count_documents({
-                'itemId': item_object_id,
-                'userId': current_user['_id']
-            })
-            
-            force_delete = request.args.get('force', '').lower() == 'true'
-            
-            if movements_count > 0 and not force_delete:
-                return jsonify({
-                    'success': False,
-                    'message': 'Cannot delete item with existing movements. Use force=true to override.',
-                    'errors': {'movements': ['Item has existing movements']},
-                    'data': {'movementsCount': movements_count}
-                }), 400
-            
-            # Delete movements if force delete
-            if force_delete and movements_count > 0:
-                mongo.db.inventory_movements.delete_many({
-                    'itemId': item_object_id,
-                    'userId': current_user['_id']
-                })
-            
-            # Delete item
-            mongo.db.inventory_items.delete_one({'_id': item_object_id})
+            invalidate_inventory_cache(current_user['_id'])
             
             return jsonify({
                 'success': True,
                 'message': 'Item deleted successfully',
-                'data': {'deletedMovements': movements_count if force_delete else 0}
+                'data': {'deletedMovements': deleted_movements}
             })
             
         except Exception as e:
@@ -837,9 +1149,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     }), 400
             
             # Validate ObjectId
-            try:
-                item_object_id = ObjectId(data['itemId'])
-            except:
+            item_object_id = _parse_oid(data['itemId'])
+            if item_object_id is None:
                 return jsonify({
                     'success': False,
                     'message': 'Invalid item ID format',
@@ -850,7 +1161,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             item = mongo.db.inventory_items.find_one({
                 '_id': item_object_id,
                 'userId': current_user['_id']
-            })
+            }, MOVEMENT_ITEM_PROJECTION)
             
             if not item:
                 return jsonify({
@@ -908,61 +1219,61 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             unit_cost = 0
             total_cost = 0
             if movement_type == 'in':
-                if 'unitCost' in data:
-                    try:
-                        unit_cost = float(data['unitCost'])
-                        if unit_cost < 0:
-                            return jsonify({
-                                'success': False,
-                                'message': 'Unit cost must be non-negative',
-                                'errors': {'unitCost': ['Unit cost must be non-negative']}
-                            }), 400
-                    except (ValueError, TypeError):
-                        return jsonify({
-                            'success': False,
-                            'message': 'Invalid unit cost format',
-                            'errors': {'unitCost': ['Unit cost must be a valid number']}
-                        }), 400
-                else:
-                    unit_cost = item['costPrice']  # Use item's cost price as default
+                cost_fields, field_error = parse_numeric_fields(data, STOCK_IN_NUMERIC_FIELDS)
+                if field_error:
+                    field, message, detail = field_error
+                    return jsonify({
+                        'success': False,
+                        'message': message,
+                        'errors': {field: [detail]}
+                    }), 400
+                # Use item's cost price as default
+                unit_cost = cost_fields.get('unitCost', item['costPrice'])
                 
                 total_cost = unit_cost * abs(quantity)
             
+            # One timestamp for the whole operation
+            now = datetime.utcnow()
+            
             # Create movement record
             movement_data = {
-                '_id': ObjectId(),
                 'userId': current_user['_id'],
                 'itemId': item_object_id,
                 'movementType': movement_type,
                 'quantity': quantity,
                 'unitCost': unit_cost,
                 'totalCost': total_cost,
-                'reason': data.get('reason', '').strip() or None,
-                'reference': data.get('reference', '').strip() or None,
+                'reason': _clean_str(data, 'reason'),
+                'reference': _clean_str(data, 'reference'),
                 'stockBefore': current_stock,
                 'stockAfter': stock_after,
-                'movementDate': datetime.utcnow(),
-                'notes': data.get('notes', '').strip() or None,
-                'createdAt': datetime.utcnow()
+                'movementDate': now,
+                'notes': _clean_str(data, 'notes'),
+                'createdAt': now
             }
             
-            # Insert movement
-            result = mongo.db.inventory_movements.insert_one(movement_data)
-            
-            # Update item stock
-            update_item_stock(item_object_id, current_user['_id'])
-            
-            # Create COGS expense for out movements
+            # Insert movement and update item stock, together with the COGS expense for out movements
             if movement_type == 'out':
-                create_cogs_expense(item_object_id, abs(quantity), current_user['_id'])
+                if not insert_sale_movement(movement_data,
+                                            build_cogs_expense(item, abs(quantity), current_user['_id'], now),
+                                            stock_after - current_stock):
+                    return jsonify({
+                        'success': False,
+                        'message': 'Item not found',
+                        'errors': {'itemId': ['Item not found']}
+                    }), 404
+            else:
+                insert_movement(movement_data)
+                if movement_type == 'adjustment':
+                    set_item_stock_level(item_object_id, current_user['_id'], stock_after)
+                else:
+                    apply_movement_delta(item_object_id, current_user['_id'], stock_after - current_stock)
             
-            # Get created movement
-            created_movement = mongo.db.inventory_movements.find_one({'_id': result.inserted_id})
-            movement_response = serialize_doc(created_movement.copy())
+            # movement_data already holds every stored field
+            movement_response = serialize_doc(movement_data)
             
             # Format dates
-            movement_response['movementDate'] = safe_date_format(movement_response.get('movementDate'), default_to_now=True)
-            movement_response['createdAt'] = safe_date_format(movement_response.get('createdAt'), default_to_now=True)
+            format_movement_dates(movement_response)
             
             return jsonify({
                 'success': True,
@@ -982,8 +1293,14 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
     def get_movements(current_user):
         """Get stock movement history with filtering"""
         try:
-            page = int(request.args.get('page', 1))
-            limit = int(request.args.get('limit', 20))
+            page, limit, page_error = parse_pagination(20)
+            if page_error:
+                field, message = page_error
+                return jsonify({
+                    'success': False,
+                    'message': message,
+                    'errors': {field: [message]}
+                }), 400
             item_id = request.args.get('itemId')
             movement_type = request.args.get('movementType')
             start_date = request.args.get('startDate')
@@ -993,9 +1310,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             query = {'userId': current_user['_id']}
             
             if item_id:
-                try:
-                    query['itemId'] = ObjectId(item_id)
-                except:
+                query['itemId'] = _parse_oid(item_id)
+                if query['itemId'] is None:
                     return jsonify({
                         'success': False,
                         'message': 'Invalid item ID format',
@@ -1012,7 +1328,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     try:
                         start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
                         date_query['$gte'] = start_dt
-                    except:
+                    except ValueError:
                         return jsonify({
                             'success': False,
                             'message': 'Invalid start date format',
@@ -1023,7 +1339,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     try:
                         end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
                         date_query['$lte'] = end_dt
-                    except:
+                    except ValueError:
                         return jsonify({
                             'success': False,
                             'message': 'Invalid end date format',
@@ -1032,26 +1348,118 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 
                 query['movementDate'] = date_query
             
-            # Get movements with pagination
-            skip = (page - 1) * limit
-            movements = list(mongo.db.inventory_movements.find(query).sort('movementDate', -1).skip(skip).limit(limit))
-            total = mongo.db.inventory_movements.count_documents(query)
+            # Deep pages can continue from a cursor instead of skipping,
+            # so each page walks only `limit` index entries. Both modes sort on
+            # (movementDate, _id) so a page-mode nextCursor resumes without gaps or repeats.
+            sort_stage = {'$sort': {'movementDate': -1, '_id': -1}}
+            cursor_param = request.args.get('cursor')
+            if cursor_param:
+                after = parse_movement_cursor(cursor_param)
+                if after is None:
+                    return jsonify({
+                        'success': False,
+                        'message': 'Invalid cursor',
+                        'errors': {'cursor': ['Invalid cursor']}
+                    }), 400
+                cursor_date, cursor_id = after
+                query = {'$and': [query, {'$or': [
+                    {'movementDate': {'$lt': cursor_date}},
+                    {'movementDate': cursor_date, '_id': {'$lt': cursor_id}}
+                ]}]}
+                skip = 0
+            else:
+                skip = (page - 1) * limit
+            
+            # Page of movements, joining item details for the page only
+            page_stages = [
+                sort_stage,
+                {'$skip': skip},
+                {'$limit': limit},
+                {'$lookup': {
+                    'from': 'inventory_items',
+                    'localField': 'itemId',
+                    'foreignField': '_id',
+                    'as': 'item'
+                }},
+                {'$unwind': {'path': '$item', 'preserveNullAndEmptyArrays': True}},
+                {'$addFields': {
+                    'itemName': '$item.itemName',
+                    'itemCode': '$item.itemCode',
+                    'unit': '$item.unit'
+                }},
+                {'$project': {'item': 0}},
+                MOVEMENT_DATES_STAGE
+            ]
             
-            # Get item details for each movement
-            movement_list = []
-            for movement in movements:
-                movement_data = serialize_doc(movement.copy())
-                movement_data['movementDate'] = safe_date_format(movement_data.get('movementDate'), default_to_now=True)
-                movement_data['createdAt'] = safe_date_format(movement_data.get('createdAt'), default_to_now=True)
+            # NDJSON clients get one movement per line straight off the cursor, without a total count
+            stream = request.args.get('stream') == '1' or \
+                request.accept_mimetypes.best == 'application/x-ndjson'
+            if stream:
+                cursor = mongo.db.inventory_movements.aggregate([{'$match': query}] + page_stages)
                 
-                # Get item details
-                item = mongo.db.inventory_items.find_one({'_id': movement['itemId']})
-                if item:
-                    movement_data['itemName'] = item['itemName']
-                    movement_data['itemCode'] = item.get('itemCode')
-                    movement_data['unit'] = item['unit']
+                def generate_movements():
+                    for movement in cursor:
+                        yield json.dumps(serialize_doc(movement), default=str) + '\n'
                 
-                movement_list.append(movement_data)
+                return Response(stream_with_context(generate_movements()), mimetype='application/x-ndjson')
+            
+            def cursor_after(movement_list):
+                """Cursor continuing after the last movement of a full page"""
+                if len(movement_list) < limit:
+                    return None
+                last = movement_list[-1]
+                return f"{last['movementDate']}_{last['id']}"
+            
+            if cursor_param:
+                movement_list = [serialize_doc(movement) for movement in
+                                 mongo.db.inventory_movements.aggregate([{'$match': query}] + page_stages)]
+                
+                return jsonify({
+                    'success': True,
+                    'data': movement_list,
+                    'pagination': {
+                        'limit': limit,
+                        'nextCursor': cursor_after(movement_list)
+                    },
+                    'message': 'Movements retrieved successfully'
+                })
+            
+            # Unfiltered listings read the maintained counter instead of counting,
+            # unless it is missing or due for a recount
+            movement_count = None
+            if len(query) == 1:
+                movement_count = mongo.db.movement_counts.find_one(
+                    {'userId': current_user['_id']},
+                    {'count': 1, 'recountedAt': 1}
+                )
+                recounted_at = movement_count.get('recountedAt') if movement_count else None
+                if not recounted_at or \
+                        (datetime.utcnow() - recounted_at).total_seconds() > MOVEMENT_COUNT_RECOUNT_SECONDS:
+                    movement_count = None
+            
+            # Get the page and, if needed, the total count in one round-trip
+            facet = {'movements': page_stages}
+            if movement_count is None:
+                facet['meta'] = [{'$count': 'total'}]
+            facet_result = list(mongo.db.inventory_movements.aggregate([
+                {'$match': query},
+                {'$facet': facet}
+            ]))
+            movements = facet_result[0]['movements'] if facet_result else []
+            if movement_count is not None:
+                total = movement_count['count']
+            else:
+                meta = facet_result[0]['meta'] if facet_result else []
+                total = meta[0]['total'] if meta else 0
+                if len(query) == 1:
+                    # Store the recount, creating the counter for users who have none yet
+                    mongo.db.movement_counts.update_one(
+                        {'userId': current_user['_id']},
+                        {'$set': {'count': total, 'recountedAt': datetime.utcnow()}},
+                        upsert=True
+                    )
+            
+            movement_list = [serialize_doc(movement) for movement in movements]
             
             return jsonify({
                 'success': True,
@@ -1060,7 +1468,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     'page': page,
                     'limit': limit,
                     'total': total,
-                    'pages': (total + limit - 1) // limit
+                    'pages': (total + limit - 1) // limit,
+                    'nextCursor': cursor_after(movement_list)
                 },
                 'message': 'Movements retrieved successfully'
             })
@@ -1078,9 +1487,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
         """Get movements for specific item"""
         try:
             # Validate ObjectId
-            try:
-                item_object_id = ObjectId(item_id)
-            except:
+            item_object_id = _parse_oid(item_id)
+            if item_object_id is None:
                 return jsonify({
                     'success': False,
                     'message': 'Invalid item ID format',
@@ -1091,7 +1499,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             item = mongo.db.inventory_items.find_one({
                 '_id': item_object_id,
                 'userId': current_user['_id']
-            })
+            }, MOVEMENT_ITEM_PROJECTION)
             
             if not item:
                 return jsonify({
@@ -1100,31 +1508,43 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     'errors': {'itemId': ['Item not found']}
                 }), 404
             
-            page = int(request.args.get('page', 1))
-            limit = int(request.args.get('limit', 20))
+            page, limit, page_error = parse_pagination(20)
+            if page_error:
+                field, message = page_error
+                return jsonify({
+                    'success': False,
+                    'message': message,
+                    'errors': {field: [message]}
+                }), 400
             
-            # Get movements for this item
+            # Get the page of movements for this item and the total count in one round-trip
             skip = (page - 1) * limit
-            movements = list(mongo.db.inventory_movements.find({
-                'itemId': item_object_id,
-                'userId': current_user['_id']
-            }).sort('movementDate', -1).skip(skip).limit(limit))
-            
-            total = mongo.db.inventory_movements.count_documents({
-                'itemId': item_object_id,
-                'userId': current_user['_id']
-            })
+            facet_result = list(mongo.db.inventory_movements.aggregate([
+                {'$match': {
+                    'itemId': item_object_id,
+                    'userId': current_user['_id']
+                }},
+                {'$facet': {
+                    'movements': [
+                        {'$sort': {'movementDate': -1}},
+                        {'$skip': skip},
+                        {'$limit': limit},
+                        {'$addFields': {
+                            'itemName': {'$literal': item['itemName']},
+                            'itemCode': {'$literal': item.get('itemCode')},
+                            'unit': {'$literal': item['unit']}
+                        }},
+                        MOVEMENT_DATES_STAGE
+                    ],
+                    'meta': [{'$count': 'total'}]
+                }}
+            ]))
+            movements = facet_result[0]['movements'] if facet_result else []
+            meta = facet_result[0]['meta'] if facet_result else []
+            total = meta[0]['total'] if meta else 0
             
-            # Serialize movements
-            movement_list = []
-            for movement in movements:
-                movement_data = serialize_doc(movement.copy())
-                movement_data['movementDate'] = safe_date_format(movement_data.get('movementDate'), default_to_now=True)
-                movement_data['createdAt'] = safe_date_format(movement_data.get('createdAt'), default_to_now=True)
-                movement_data['itemName'] = item['itemName']
-                movement_data['itemCode'] = item.get('itemCode')
-                movement_data['unit'] = item['unit']
-                movement_list.append(movement_data)
+            # Serialize movements - dates and item fields were filled in by the pipeline
+            movement_list = [serialize_doc(movement) for movement in movements]
             
             return jsonify({
                 'success': True,
@@ -1151,6 +1571,47 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 'errors': {'general': [str(e)]}
             }), 500
 
+    @inventory_bp.route('/items/<item_id>/reconcile', methods=['POST'])
+    @token_required
+    def reconcile_item(current_user, item_id):
+        """Rebuild an item's stock level from its movement history"""
+        try:
+            # Validate ObjectId
+            item_object_id = _parse_oid(item_id)
+            if item_object_id is None:
+                return jsonify({
+                    'success': False,
+                    'message': 'Invalid item ID format',
+                    'errors': {'itemId': ['Invalid item ID format']}
+                }), 400
+            
+            item = reconcile_item_stock(item_object_id, current_user['_id'])
+            
+            if not item:
+                return jsonify({
+                    'success': False,
+                    'message': 'Item not found',
+                    'errors': {'itemId': ['Item not found']}
+                }), 404
+            
+            return jsonify({
+                'success': True,
+                'data': {
+                    'id': str(item['_id']),
+                    'currentStock': item['currentStock'],
+                    'status': item['status'],
+                    'isLowStock': item['isLowStock']
+                },
+                'message': 'Item stock reconciled successfully'
+            })
+            
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': 'Failed to reconcile item stock',
+                'errors': {'general': [str(e)]}
+            }), 500
+
     # ==================== STOCK OPERATIONS ====================
 
     @inventory_bp.route('/stock-in', methods=['POST'])
@@ -1171,9 +1632,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     }), 400
             
             # Validate ObjectId
-            try:
-                item_object_id = ObjectId(data['itemId'])
-            except:
+            item_object_id = _parse_oid(data['itemId'])
+            if item_object_id is None:
                 return jsonify({
                     'success': False,
                     'message': 'Invalid item ID format',
@@ -1184,7 +1644,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             item = mongo.db.inventory_items.find_one({
                 '_id': item_object_id,
                 'userId': current_user['_id']
-            })
+            }, MOVEMENT_ITEM_PROJECTION)
             
             if not item:
                 return jsonify({
@@ -1210,22 +1670,15 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 }), 400
             
             # Validate unit cost
-            unit_cost = item['costPrice']  # Default to item's cost price
-            if 'unitCost' in data:
-                try:
-                    unit_cost = float(data['unitCost'])
-                    if unit_cost < 0:
-                        return jsonify({
-                            'success': False,
-                            'message': 'Unit cost must be non-negative',
-                            'errors': {'unitCost': ['Unit cost must be non-negative']}
-                        }), 400
-                except (ValueError, TypeError):
-                    return jsonify({
-                        'success': False,
-                        'message': 'Invalid unit cost format',
-                        'errors': {'unitCost': ['Unit cost must be a valid number']}
-                    }), 400
+            cost_fields, field_error = parse_numeric_fields(data, STOCK_IN_NUMERIC_FIELDS)
+            if field_error:
+                field, message, detail = field_error
+                return jsonify({
+                    'success': False,
+                    'message': message,
+                    'errors': {field: [detail]}
+                }), 400
+            unit_cost = cost_fields.get('unitCost', item['costPrice'])  # Default to item's cost price
             
             # Calculate total cost
             total_cost = unit_cost * quantity
@@ -1234,9 +1687,11 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             current_stock = item['currentStock']
             stock_after = current_stock + quantity
             
+            # One timestamp for the whole operation
+            now = datetime.utcnow()
+            
             # Create movement record
             movement_data = {
-                '_id': ObjectId(),
                 'userId': current_user['_id'],
                 'itemId': item_object_id,
                 'movementType': 'in',
@@ -1244,40 +1699,28 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 'unitCost': unit_cost,
                 'totalCost': total_cost,
                 'reason': 'stock_in',
-                'reference': data.get('reference', '').strip() or f"Stock In - {datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
+                'reference': _clean_str(data, 'reference') or f"Stock In - {now.strftime('%Y%m%d%H%M%S')}",
                 'stockBefore': current_stock,
                 'stockAfter': stock_after,
-                'movementDate': datetime.utcnow(),
-                'notes': data.get('notes', '').strip() or None,
-                'supplier': data.get('supplier', '').strip() or None,
-                'purchaseOrder': data.get('purchaseOrder', '').strip() or None,
-                'createdAt': datetime.utcnow()
+                'movementDate': now,
+                'notes': _clean_str(data, 'notes'),
+                'supplier': _clean_str(data, 'supplier'),
+                'purchaseOrder': _clean_str(data, 'purchaseOrder'),
+                'createdAt': now
             }
             
             # Insert movement
-            result = mongo.db.inventory_movements.insert_one(movement_data)
-            
-            # Update item stock and last restocked date
-            mongo.db.inventory_items.update_one(
-                {'_id': item_object_id},
-                {
-                    '$set': {
-                        'lastRestocked': datetime.utcnow(),
-                        'updatedAt': datetime.utcnow()
-                    }
-                }
-            )
+            insert_movement(movement_data)
             
-            # Update item stock using helper function
-            update_item_stock(item_object_id, current_user['_id'])
+            # Update item stock and last restocked date in one write
+            apply_movement_delta(item_object_id, current_user['_id'], quantity,
+                                 extra_set={'lastRestocked': now})
             
-            # Get created movement
-            created_movement = mongo.db.inventory_movements.find_one({'_id': result.inserted_id})
-            movement_response = serialize_doc(created_movement.copy())
+            # movement_data already holds every stored field
+            movement_response = serialize_doc(movement_data)
             
             # Format dates
-            movement_response['movementDate'] = safe_date_format(movement_response.get('movementDate'), default_to_now=True)
-            movement_response['createdAt'] = safe_date_format(movement_response.get('createdAt'), default_to_now=True)
+            format_movement_dates(movement_response)
             
             # Add item info
             movement_response['itemName'] = item['itemName']
@@ -1315,9 +1758,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     }), 400
             
             # Validate ObjectId
-            try:
-                item_object_id = ObjectId(data['itemId'])
-            except:
+            item_object_id = _parse_oid(data['itemId'])
+            if item_object_id is None:
                 return jsonify({
                     'success': False,
                     'message': 'Invalid item ID format',
@@ -1328,7 +1770,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             item = mongo.db.inventory_items.find_one({
                 '_id': item_object_id,
                 'userId': current_user['_id']
-            })
+            }, MOVEMENT_ITEM_PROJECTION)
             
             if not item:
                 return jsonify({
@@ -1365,9 +1807,11 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             
             stock_after = current_stock - quantity
             
+            # One timestamp for the whole operation
+            now = datetime.utcnow()
+            
             # Create movement record
             movement_data = {
-                '_id': ObjectId(),
                 'userId': current_user['_id'],
                 'itemId': item_object_id,
                 'movementType': 'out',
@@ -1375,33 +1819,31 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 'unitCost': item['costPrice'],
                 'totalCost': item['costPrice'] * quantity,
                 'reason': 'stock_out',
-                'reference': data.get('reference', '').strip() or f"Stock Out - {datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
+                'reference': _clean_str(data, 'reference') or f"Stock Out - {now.strftime('%Y%m%d%H%M%S')}",
                 'stockBefore': current_stock,
                 'stockAfter': stock_after,
-                'movementDate': datetime.utcnow(),
-                'notes': data.get('notes', '').strip() or None,
-                'customer': data.get('customer', '').strip() or None,
-                'salesOrder': data.get('salesOrder', '').strip() or None,
+                'movementDate': now,
+                'notes': _clean_str(data, 'notes'),
+                'customer': _clean_str(data, 'customer'),
+                'salesOrder': _clean_str(data, 'salesOrder'),
                 'sellingPrice': data.get('sellingPrice'),
-                'createdAt': datetime.utcnow()
+                'createdAt': now
             }
             
-            # Insert movement
-            result = mongo.db.inventory_movements.insert_one(movement_data)
-            
-            # Update item stock using helper function
-            update_item_stock(item_object_id, current_user['_id'])
-            
-            # Create COGS expense
-            create_cogs_expense(item_object_id, quantity, current_user['_id'])
+            # Insert movement, its COGS expense and the stock decrement in one transaction
+            if not insert_sale_movement(movement_data, build_cogs_expense(item, quantity, current_user['_id'], now),
+                                        -quantity):
+                return jsonify({
+                    'success': False,
+                    'message': 'Item not found',
+                    'errors': {'itemId': ['Item not found']}
+                }), 404
             
-            # Get created movement
-            created_movement = mongo.db.inventory_movements.find_one({'_id': result.inserted_id})
-            movement_response = serialize_doc(created_movement.copy())
+            # movement_data already holds every stored field
+            movement_response = serialize_doc(movement_data)
             
             # Format dates
-            movement_response['movementDate'] = safe_date_format(movement_response.get('movementDate'), default_to_now=True)
-            movement_response['createdAt'] = safe_date_format(movement_response.get('createdAt'), default_to_now=True)
+            format_movement_dates(movement_response)
             
             # Add item info
             movement_response['itemName'] = item['itemName']
@@ -1445,9 +1887,8 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     }), 400
             
             # Validate ObjectId
-            try:
-                item_object_id = ObjectId(data['itemId'])
-            except:
+            item_object_id = _parse_oid(data['itemId'])
+            if item_object_id is None:
                 return jsonify({
                     'success': False,
                     'message': 'Invalid item ID format',
@@ -1458,7 +1899,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             item = mongo.db.inventory_items.find_one({
                 '_id': item_object_id,
                 'userId': current_user['_id']
-            })
+            }, MOVEMENT_ITEM_PROJECTION)
             
             if not item:
                 return jsonify({
@@ -1497,9 +1938,11 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     'data': {'currentStock': current_stock}
                 }), 400
             
+            # One timestamp for the whole operation
+            now = datetime.utcnow()
+            
             # Create movement record
             movement_data = {
-                '_id': ObjectId(),
                 'userId': current_user['_id'],
                 'itemId': item_object_id,
                 'movementType': 'adjustment',
@@ -1508,28 +1951,26 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 'unitCost': 0,  # No cost for adjustments
                 'totalCost': 0,
                 'reason': data['reason'].strip(),
-                'reference': data.get('reference', '').strip() or f"Stock Adjustment - {datetime.utcnow().strftime('%Y%m%d%H%M%S')}",
+                'reference': _clean_str(data, 'reference') or f"Stock Adjustment - {now.strftime('%Y%m%d%H%M%S')}",
                 'stockBefore': current_stock,
                 'stockAfter': new_stock_level,
-                'movementDate': datetime.utcnow(),
-                'notes': data.get('notes', '').strip() or None,
+                'movementDate': now,
+                'notes': _clean_str(data, 'notes'),
                 'adjustedBy': current_user.get('email', 'Unknown'),
-                'createdAt': datetime.utcnow()
+                'createdAt': now
             }
             
             # Insert movement
-            result = mongo.db.inventory_movements.insert_one(movement_data)
+            insert_movement(movement_data)
             
-            # Update item stock using helper function
-            update_item_stock(item_object_id, current_user['_id'])
+            # Set item stock to the adjusted level
+            set_item_stock_level(item_object_id, current_user['_id'], new_stock_level)
             
-            # Get created movement
-            created_movement = mongo.db.inventory_movements.find_one({'_id': result.inserted_id})
-            movement_response = serialize_doc(created_movement.copy())
+            # movement_data already holds every stored field
+            movement_response = serialize_doc(movement_data)
             
             # Format dates
-            movement_response['movementDate'] = safe_date_format(movement_response.get('movementDate'), default_to_now=True)
-            movement_response['createdAt'] = safe_date_format(movement_response.get('createdAt'), default_to_now=True)
+            format_movement_dates(movement_response)
             
             # Add item info
             movement_response['itemName'] = item['itemName']
@@ -1556,64 +1997,88 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
     def get_low_stock_items(current_user):
         """Get low stock items"""
         try:
-            page = int(request.args.get('page', 1))
-            limit = int(request.args.get('limit', 20))
+            page, limit, page_error = parse_pagination(20)
+            if page_error:
+                field, message = page_error
+                return jsonify({
+                    'success': False,
+                    'message': message,
+                    'errors': {field: [message]}
+                }), 400
             category = request.args.get('category')
             
-            # Build query for low stock items
+            cache_params = {'page': page, 'limit': limit, 'category': category or ''}
+            cached_report = enhanced_cache.get(current_user['_id'], 'inventory_low_stock', **cache_params)
+            if cached_report is not None:
+                return jsonify({
+                    'success': True,
+                    **cached_report,
+                    'message': 'Low stock items retrieved successfully'
+                })
+            
+            # Build query for low stock items - isLowStock is kept up to date on every stock write
             query = {
                 'userId': current_user['_id'],
-                '$expr': {'$lte': ['$currentStock', '$minimumStock']}
+                'isLowStock': True
             }
             
             if category:
                 query['category'] = category
             
-            # Get low stock items with pagination
+            # Get low stock items with pagination, deriving the reorder fields server-side
             skip = (page - 1) * limit
-            items = list(mongo.db.inventory_items.find(query).sort('currentStock', 1).skip(skip).limit(limit))
-            total = mongo.db.inventory_items.count_documents(query)
-            
-            # Serialize items with additional low stock info
-            item_list = []
-            for item in items:
-                item_data = serialize_doc(item.copy())
-                item_data['createdAt'] = safe_date_format(item_data.get('createdAt'), default_to_now=True)
-                item_data['updatedAt'] = safe_date_format(item_data.get('updatedAt'), default_to_now=True)
-                item_data['lastRestocked'] = safe_date_format(item_data.get('lastRestocked'))
-                
-                # Calculate stock deficit
-                stock_deficit = item['minimumStock'] - item['currentStock']
-                item_data['stockDeficit'] = max(0, stock_deficit)
-                
-                # Calculate suggested reorder quantity (minimum stock + 50% buffer)
-                suggested_reorder = int(item['minimumStock'] * 1.5) - item['currentStock']
-                item_data['suggestedReorderQuantity'] = max(0, suggested_reorder)
-                
-                # Calculate days since last restock
-                if item.get('lastRestocked'):
-                    days_since_restock = (datetime.utcnow() - item['lastRestocked']).days
-                    item_data['daysSinceLastRestock'] = days_since_restock
-                else:
-                    item_data['daysSinceLastRestock'] = None
-                
-                # Priority level based on stock level
-                if item['currentStock'] <= 0:
-                    item_data['priority'] = 'critical'
-                elif item['currentStock'] <= item['minimumStock'] * 0.5:
-                    item_data['priority'] = 'high'
-                else:
-                    item_data['priority'] = 'medium'
-                
-                item_list.append(item_data)
+            now = datetime.utcnow()
+            facet_result = list(mongo.db.inventory_items.aggregate([
+                {'$match': query},
+                {'$addFields': {
+                    # Timestamps stay datetimes and are written as ISO strings by the JSON provider
+                    'createdAt': {'$ifNull': ['$createdAt', now]},
+                    'updatedAt': {'$ifNull': ['$updatedAt', now]},
+                    'lastRestocked': {'$ifNull': ['$lastRestocked', None]},
+                    'stockDeficit': {'$max': [0, {'$subtract': ['$minimumStock', '$currentStock']}]},
+                    # Minimum stock + 50% buffer
+                    'suggestedReorderQuantity': {'$max': [0, {'$subtract': [
+                        {'$toInt': {'$multiply': ['$minimumStock', 1.5]}}, '$currentStock'
+                    ]}]},
+                    'daysSinceLastRestock': {'$cond': [
+                        {'$ifNull': ['$lastRestocked', False]},
+                        {'$toInt': {'$divide': [{'$subtract': [now, '$lastRestocked']}, 24 * 60 * 60 * 1000]}},
+                        None
+                    ]},
+                    'priority': {'$switch': {
+                        'branches': [
+                            {'case': {'$lte': ['$currentStock', 0]}, 'then': 'critical'},
+                            {'case': {'$lte': ['$currentStock', {'$multiply': ['$minimumStock', 0.5]}]}, 'then': 'high'}
+                        ],
+                        'default': 'medium'
+                    }}
+                }},
+                {'$facet': {
+                    'items': [
+                        {'$sort': {'currentStock': 1}},
+                        {'$skip': skip},
+                        {'$limit': limit},
+                        # Serialize the ids server-side so the page needs no per-row serialize_doc copy
+                        {'$addFields': {'id': {'$toString': '$_id'}, 'userId': {'$toString': '$userId'}}},
+                        {'$project': {'_id': 0}}
+                    ],
+                    'priorities': [{'$group': {'_id': '$priority', 'count': {'$sum': 1}}}],
+                    'meta': [{'$count': 'total'}]
+                }}
+            ]))
+            items = facet_result[0]['items'] if facet_result else []
+            meta = facet_result[0]['meta'] if facet_result else []
+            total = meta[0]['total'] if meta else 0
+            priority_counts = {
+                group['_id']: group['count'] for group in (facet_result[0]['priorities'] if facet_result else [])
+            }
             
-            # Calculate summary statistics
-            critical_items = len([item for item in item_list if item['priority'] == 'critical'])
-            high_priority_items = len([item for item in item_list if item['priority'] == 'high'])
+            # Summary statistics cover every low stock item, not just this page
+            critical_items = priority_counts.get('critical', 0)
+            high_priority_items = priority_counts.get('high', 0)
             
-            return jsonify({
-                'success': True,
-                'data': item_list,
+            report = {
+                'data': items,
                 'pagination': {
                     'page': page,
                     'limit': limit,
@@ -1624,7 +2089,14 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     'totalLowStockItems': total,
                     'criticalItems': critical_items,
                     'highPriorityItems': high_priority_items
-                },
+                }
+            }
+            enhanced_cache.set(current_user['_id'], 'inventory_low_stock', report,
+                               ttl_seconds=REPORT_CACHE_TTL_SECONDS, **cache_params)
+            
+            return jsonify({
+                'success': True,
+                **report,
                 'message': 'Low stock items retrieved successfully'
             })
             
@@ -1643,17 +2115,52 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             method = request.args.get('method', 'current').lower()  # current, fifo, lifo, average
             category = request.args.get('category')
             
+            cache_params = {'method': method, 'category': category or ''}
+            cached_report = enhanced_cache.get(current_user['_id'], 'inventory_valuation', **cache_params)
+            if cached_report is not None:
+                return jsonify({
+                    'success': True,
+                    'data': cached_report,
+                    'message': 'Inventory valuation report generated successfully'
+                })
+            
+            now = datetime.utcnow()
+            
             # Build query
             query = {'userId': current_user['_id']}
             if category:
                 query['category'] = category
             
             # Get all items
-            items = list(mongo.db.inventory_items.find(query))
+            items = list(mongo.db.inventory_items.find(query, VALUATION_ITEM_PROJECTION))
+            
+            # Get every item's stock-in movements in one aggregation rather than one query per item
+            in_movements = {}
+            if method in ('fifo', 'lifo', 'average'):
+                movement_match = {'userId': current_user['_id'], 'movementType': 'in'}
+                if category:
+                    movement_match['itemId'] = {'$in': [item['_id'] for item in items]}
+                
+                group_stage = {
+                    '_id': '$itemId',
+                    'totalCost': {'$sum': '$totalCost'},
+                    'totalQuantity': {'$sum': '$quantity'}
+                }
+                pipeline = [{'$match': movement_match}]
+                if method != 'average':
+                    # Purchase layers in the order the method consumes them
+                    pipeline.append({'$sort': {'movementDate': 1 if method == 'fifo' else -1}})
+                    group_stage['movements'] = {'$push': {'quantity': '$quantity', 'unitCost': '$unitCost'}}
+                pipeline.append({'$group': group_stage})
+                
+                in_movements = {group['_id']: group for group in mongo.db.inventory_movements.aggregate(pipeline)}
             
             valuation_data = []
             total_value = 0
             total_quantity = 0
+            total_potential_revenue = 0
+            total_potential_profit = 0
+            category_summary = {}
             
             for item in items:
                 item_valuation = {
@@ -1673,62 +2180,31 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     item_valuation['totalValue'] = item_value
                     item_valuation['method'] = 'Current Cost Price'
                 
-                elif method == 'fifo':
-                    # FIFO - First In, First Out
-                    movements = list(mongo.db.inventory_movements.find({
-                        'itemId': item['_id'],
-                        'userId': current_user['_id'],
-                        'movementType': 'in'
-                    }).sort('movementDate', 1))
+                elif method in ('fifo', 'lifo'):
+                    # FIFO - First In, First Out / LIFO - Last In, First Out
+                    # Stock is valued from the purchase layers in consumption order
+                    purchases = in_movements.get(item['_id'], {}).get('movements', [])
                     
                     remaining_stock = item['currentStock']
-                    fifo_value = 0
+                    layered_value = 0
                     
-                    for movement in movements:
+                    for movement in purchases:
                         if remaining_stock <= 0:
                             break
                         
                         movement_qty = min(movement['quantity'], remaining_stock)
-                        fifo_value += movement_qty * movement['unitCost']
+                        layered_value += movement_qty * movement['unitCost']
                         remaining_stock -= movement_qty
                     
-                    item_valuation['totalValue'] = fifo_value
-                    item_valuation['unitValue'] = fifo_value / item['currentStock'] if item['currentStock'] > 0 else 0
-                    item_valuation['method'] = 'FIFO'
-                
-                elif method == 'lifo':
-                    # LIFO - Last In, First Out
-                    movements = list(mongo.db.inventory_movements.find({
-                        'itemId': item['_id'],
-                        'userId': current_user['_id'],
-                        'movementType': 'in'
-                    }).sort('movementDate', -1))
-                    
-                    remaining_stock = item['currentStock']
-                    lifo_value = 0
-                    
-                    for movement in movements:
-                        if remaining_stock <= 0:
-                            break
-                        
-                        movement_qty = min(movement['quantity'], remaining_stock)
-                        lifo_value += movement_qty * movement['unitCost']
-                        remaining_stock -= movement_qty
-                    
-                    item_valuation['totalValue'] = lifo_value
-                    item_valuation['unitValue'] = lifo_value / item['currentStock'] if item['currentStock'] > 0 else 0
-                    item_valuation['method'] = 'LIFO'
+                    item_valuation['totalValue'] = layered_value
+                    item_valuation['unitValue'] = layered_value / item['currentStock'] if item['currentStock'] > 0 else 0
+                    item_valuation['method'] = method.upper()
                 
                 elif method == 'average':
                     # Weighted Average Cost
-                    movements = list(mongo.db.inventory_movements.find({
-                        'itemId': item['_id'],
-                        'userId': current_user['_id'],
-                        'movementType': 'in'
-                    }))
-                    
-                    total_cost = sum(movement['totalCost'] for movement in movements)
-                    total_qty = sum(movement['quantity'] for movement in movements)
+                    purchase_totals = in_movements.get(item['_id'])
+                    total_cost = purchase_totals['totalCost'] if purchase_totals else 0
+                    total_qty = purchase_totals['totalQuantity'] if purchase_totals else 0
                     
                     if total_qty > 0:
                         avg_unit_cost = total_cost / total_qty
@@ -1748,48 +2224,48 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                 item_valuation['potentialProfit'] = potential_profit
                 
                 valuation_data.append(item_valuation)
+                
+                # Accumulate the summary and category breakdown in the same pass
                 total_value += item_valuation['totalValue']
                 total_quantity += item['currentStock']
-            
-            # Calculate summary
-            total_potential_revenue = sum(item['potentialRevenue'] for item in valuation_data)
-            total_potential_profit = sum(item['potentialProfit'] for item in valuation_data)
-            
-            # Group by category
-            category_summary = {}
-            for item in valuation_data:
-                cat = item['category']
-                if cat not in category_summary:
-                    category_summary[cat] = {
+                total_potential_revenue += potential_revenue
+                total_potential_profit += potential_profit
+                
+                cat_totals = category_summary.get(item['category'])
+                if cat_totals is None:
+                    cat_totals = category_summary[item['category']] = {
                         'totalValue': 0,
                         'totalQuantity': 0,
                         'itemCount': 0,
                         'potentialRevenue': 0,
                         'potentialProfit': 0
                     }
-                
-                category_summary[cat]['totalValue'] += item['totalValue']
-                category_summary[cat]['totalQuantity'] += item['currentStock']
-                category_summary[cat]['itemCount'] += 1
-                category_summary[cat]['potentialRevenue'] += item['potentialRevenue']
-                category_summary[cat]['potentialProfit'] += item['potentialProfit']
+                cat_totals['totalValue'] += item_valuation['totalValue']
+                cat_totals['totalQuantity'] += item['currentStock']
+                cat_totals['itemCount'] += 1
+                cat_totals['potentialRevenue'] += potential_revenue
+                cat_totals['potentialProfit'] += potential_profit
+            
+            report = {
+                'items': valuation_data,
+                'summary': {
+                    'totalValue': total_value,
+                    'totalQuantity': total_quantity,
+                    'totalItems': len(valuation_data),
+                    'potentialRevenue': total_potential_revenue,
+                    'potentialProfit': total_potential_profit,
+                    'profitMargin': (total_potential_profit / total_potential_revenue * 100) if total_potential_revenue > 0 else 0
+                },
+                'categoryBreakdown': category_summary,
+                'valuationMethod': method.upper(),
+                'generatedAt': now
+            }
+            enhanced_cache.set(current_user['_id'], 'inventory_valuation', report,
+                               ttl_seconds=REPORT_CACHE_TTL_SECONDS, **cache_params)
             
             return jsonify({
                 'success': True,
-                'data': {
-                    'items': valuation_data,
-                    'summary': {
-                        'totalValue': total_value,
-                        'totalQuantity': total_quantity,
-                        'totalItems': len(valuation_data),
-                        'potentialRevenue': total_potential_revenue,
-                        'potentialProfit': total_potential_profit,
-                        'profitMargin': (total_potential_profit / total_potential_revenue * 100) if total_potential_revenue > 0 else 0
-                    },
-                    'categoryBreakdown': category_summary,
-                    'valuationMethod': method.upper(),
-                    'generatedAt': safe_date_format(datetime.utcnow(), default_to_now=True)
-                },
+                'data': report,
                 'message': 'Inventory valuation report generated successfully'
             })
             
@@ -1805,8 +2281,14 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
     def get_movement_history_report(current_user):
         """Get comprehensive movement history with analytics"""
         try:
-            page = int(request.args.get('page', 1))
-            limit = int(request.args.get('limit', 50))
+            page, limit, page_error = parse_pagination(50)
+            if page_error:
+                field, message = page_error
+                return jsonify({
+                    'success': False,
+                    'message': message,
+                    'errors': {field: [message]}
+                }), 400
             start_date = request.args.get('startDate')
             end_date = request.args.get('endDate')
             category = request.args.get('category')
@@ -1822,7 +2304,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     try:
                         start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
                         date_query['$gte'] = start_dt
-                    except:
+                    except ValueError:
                         return jsonify({
                             'success': False,
                             'message': 'Invalid start date format',
@@ -1833,7 +2315,7 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
                     try:
                         end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
                         date_query['$lte'] = end_dt
-                    except:
+                    except ValueError:
                         return jsonify({
                             'success': False,
                             'message': 'Invalid end date format',
@@ -1845,103 +2327,118 @@ def init_inventory_blueprint(mongo, token_required, serialize_doc):
             if movement_type:
                 query['movementType'] = movement_type.lower()
             
+            if category:
+                # Resolve the category to its item ids so the filter runs on the movements index
+                # rather than on a join of every matching movement
+                category_item_ids = [
+                    item['_id'] for item in mongo.db.inventory_items.find(
+                        {'userId': current_user['_id'], 'category': category}, {'_id': 1}
+                    )
+                ]
+                query['itemId'] = {'$in': category_item_ids}
+            
             # Get movements with item details
-            pipeline = [
-                {'$match': query},
+            item_lookup = [
                 {
                     '$lookup': {
                         'from': 'inventory_items',
-                        'localField': 'itemId',
-                        'foreignField': '_id',
+                        'let': {'itemId': '$itemId'},
+                        'pipeline': [
+                            {'$match': {'$expr': {'$eq': ['$_id', '$$itemId']}}},
+                            {'$project': HISTORY_ITEM_PROJECTION}
+                        ],
                         'as': 'item'
                     }
                 },
-                {'$unwind': '$item'},
-                {'$sort': {'movementDate': -1}}
+                # Movements of deleted items are kept with null item fields, so pages agree with the total
+                {'$unwind': {'path': '$item', 'preserveNullAndEmptyArrays': True}}
             ]
-            
-            if category:
-                pipeline.insert(-1, {'$match': {'item.category': category}})
-            
-            # Add pagination
-            pipeline.extend([
+            # Only the page being returned is joined
+            page_stages = [
+                {'$sort': {'movementDate': -1}},
                 {'$skip': (page - 1) * limit},
                 {'$limit': limit}
-            ])
-            
-            movements = list(mongo.db.inventory_movements.aggregate(pipeline))
+            ] + item_lookup
+            pipeline = [{'$match': query}]
+            
+            # Get the page, the total count and the analytics over every match in one round-trip
+            pipeline.append({'$facet': {
+                'movements': page_stages,
+                'meta': [{'$count': 'total'}],
+                'byType': [{'$group': {
+                    '_id': '$movementType',
+                    'count': {'$sum': 1},
+                    'totalCost': {'$sum': '$totalCost'},
+                    'quantity': {'$sum': '$quantity'}
+                }}],
+                # Distinct items first, so only one item per affected item is joined for its category
+                'affected': [
+                    {'$group': {'_id': '$itemId'}},
+                    {'$lookup': {
+                        'from': 'inventory_items',
+                        'let': {'itemId': '$_id'},
+                        'pipeline': [
+                            {'$match': {'$expr': {'$eq': ['$_id', '$$itemId']}}},
+                            {'$project': {'_id': 0, 'category': 1}}
+                        ],
+                        'as': 'item'
+                    }},
+                    {'$unwind': '$item'},
+                    {'$group': {
+                        '_id': None,
+                        'items': {'$sum': 1},
+                        'categories': {'$addToSet': '$item.category'}
+                    }}
+                ]
+            }})
             
-            # Get total count for pagination
-            count_pipeline = pipeline[:-2]  # Remove skip and limit
-            count_pipeline.append({'$count': 'total'})
-            count_result = list(mongo.db.inventory_movements.aggregate(count_pipeline))
-            total = count_result[0]['total'] if count_result else 0
+            facet_result = list(mongo.db.inventory_movements.aggregate(pipeline))
+            facet = facet_result[0] if facet_result else {}
+            movements = facet.get('movements', [])
+            meta = facet.get('meta', [])
+            total = meta[0]['total'] if meta else 0
             
-            # Process movements
+            # Process movements; dates stay datetimes for the JSON provider to write
+            now = datetime.utcnow()
             movement_list = []
             for movement in movements:
+                item = movement.get('item', {})
                 movement_data = {
                     'movementId': str(movement['_id']),
                     'itemId': str(movement['itemId']),
-                    'itemName': movement['item']['itemName'],
-                    'itemCode': movement['item'].get('itemCode'),
-                    'category': movement['item']['category'],
-                    'unit': movement['item']['unit'],
+                    'itemName': item.get('itemName'),
+                    'itemCode': item.get('itemCode'),
+                    'category': item.get('category'),
+                    'unit': item.get('unit'),
                     'movementType': movement['movementType'],
-                    'quantity': movement['quantity'],
-                    'unitCost': movement.get('unitCost', 0),
-                    'totalCost': movement.get('totalCost', 0),
-                    'reason': movement.get('reason'),
-                    'reference': movement.get('reference'),
-                    'stockBefore': movement.get('stockBefore', 0),
-                    'stockAfter': movement.get('stockAfter', 0),
-                    'movementDate': safe_date_format(movement.get('movementDate'), default_to_now=True),
-                    'notes': movement.get('notes'),
-                    'createdAt': safe_date_format(movement.get('createdAt'), default_to_now=True)
+                    'movementDate': movement.get('movementDate') or now,
+                    'createdAt': movement.get('createdAt') or now
                 }
+                for field, default in HISTORY_MOVEMENT_FIELDS:
+                    movement_data[field] = movement.get(field, default)
                 
                 # Add type-specific fields
-                if movement['movementType'] == 'in':
-                    movement_data['supplier'] = movement.get('supplier')
-                    movement_data['purchaseOrder'] = movement.get('purchaseOrder')
-                elif movement['movementType'] == 'out':
-                    movement_data['customer'] = movement.get('customer')
-                    movement_data['salesOrder'] = movement.get('salesOrder')
-                    movement_data['sellingPrice'] = movement.get('sellingPrice')
-                elif movement['movementType'] == 'adjustment':
-                    movement_data['adjustmentQuantity'] = movement.get('adjustmentQuantity')
-                    movement_data['adjustedBy'] = movement.get('adjustedBy')
+                for field in HISTORY_TYPE_FIELDS.get(movement['movementType'], ()):
+                    movement_data[field] = movement.get(field)
                 
                 movement_list.append(movement_data)
             
-            # Calculate analytics
+            # Analytics cover every matching movement, not just this page
+            by_type = {group['_id']: group for group in facet.get('byType', [])}
+            affected = facet.get('affected') or [{'items': 0, 'categories': []}]
+            type_in = by_type.get('in', {})
+            type_out = by_type.get('out', {})
             analytics = {
                 'totalMovements': total,
-                'movementsByType': {},
-                'totalValueIn': 0,
-                'totalValueOut': 0,
-                'totalQuantityIn': 0,
-                'totalQuantityOut': 0,
-                'categoriesAffected': set(),
-                'itemsAffected': set()
+                'movementsByType': {mov_type: group['count'] for mov_type, group in by_type.items()},
+                'totalValueIn': type_in.get('totalCost', 0),
+                'totalValueOut': type_out.get('totalCost', 0),
+                'totalQuantityIn': type_in.get('quantity', 0),
+                'totalQuantityOut': type_out.get('quantity', 0),
+                'categoriesAffected': len(affected[0]['categories']),
+                'itemsAffected': affected[0]['items']
             }
             
-            for movement in movement_list:
-                mov_type = movement['movementType']
-                analytics['movementsByType'][mov_type] = analytics['movementsByType'].get(mov_type, 0) + 1
-                analytics['categoriesAffected'].add(movement['category'])
-                analytics['itemsAffected'].add(movement['itemId'])
-                
-                if mov_type == 'in':
-                    analytics['totalValueIn'] += movement['totalCost']
-                    analytics['totalQuantityIn'] += movement['quantity']
-                elif mov_type == 'out':
-                    analytics['totalValueOut'] += movement['totalCost']
-                    analytics['totalQuantityOut'] += movement['quantity']
-            
-            analytics['categoriesAffected'] = len(analytics['categoriesAffected'])
-            analytics['itemsAffected'] = len(analytics['itemsAffected'])
-            
             return jsonify({
                 'success': True,
                 'data': movement_list,
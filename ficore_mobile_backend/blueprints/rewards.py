@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime, timedelta
 from bson import ObjectId
-import traceback
+from pymongo import ReturnDocument
+import logging
+
+logger = logging.getLogger(__name__)
+
 
 def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
     rewards_bp = Blueprint('rewards', __name__, url_prefix='/rewards')
@@ -115,6 +119,37 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             'milestone_target': 100
         }
     }
+
+    # Static part of each /available entry, in REWARD_CONFIG order, built once per blueprint
+    REWARD_TEMPLATES = tuple(
+        (
+            reward_id,
+            config,
+            {
+                'id': reward_id,
+                'name': config['name'],
+                'description': config['description'],
+                'cost': config['cost'],
+                'category': config['category']
+            },
+            config.get('subscriber_only', False)
+        )
+        for reward_id, config in REWARD_CONFIG.items()
+    )
+
+    # What non-subscribers see for subscriber-only rewards never depends on the user
+    LOCKED_SUBSCRIBER_REWARDS = [
+        {
+            **template,
+            'is_available': False,
+            'insufficient_credits': False,
+            'has_active_benefit': False,
+            'subscriber_only': True,
+            'requires_subscription': True
+        }
+        for _, _, template, is_subscriber_only in REWARD_TEMPLATES
+        if is_subscriber_only
+    ]
     
     # Earning milestones configuration
     EARNING_CONFIG = {
@@ -135,6 +170,12 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
         }
     }
 
+    # Benefit types that cannot be stacked, mapped to the user flag marking one as active
+    CONFLICTING_BENEFIT_FLAGS = {
+        'temp_discount': 'temp_fc_discount_active',
+        'free_pdf_exports': 'free_pdf_export_active'
+    }
+
     @rewards_bp.route('/', methods=['GET'])
     @token_required
     def get_rewards_dashboard(current_user):
@@ -147,27 +188,33 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                     'message': 'Invalid user session'
                 }), 401
 
-            # Get user data with rewards fields
-            user = mongo.db.users.find_one({'_id': current_user['_id']})
-            if not user:
-                return jsonify({
-                    'success': False,
-                    'message': 'User not found'
-                }), 404
+            # token_required has already loaded this request's user document
+            user = current_user
+            now = datetime.utcnow()
+
+            # Fetch the rewards and entry streak records together in one round trip
+            streak_records = next(mongo.db.users.aggregate([
+                {'$match': {'_id': current_user['_id']}},
+                {'$project': {'_id': 1}},
+                {'$lookup': {'from': 'rewards', 'localField': '_id', 'foreignField': 'user_id', 'as': 'rewards'}},
+                {'$lookup': {'from': 'entry_streaks', 'localField': '_id', 'foreignField': 'user_id', 'as': 'entry_streaks'}}
+            ]), {})
+            rewards_record = (streak_records.get('rewards') or [None])[0]
+            entry_streak_record = (streak_records.get('entry_streaks') or [None])[0]
 
-            # Get or create rewards record
-            rewards_record = mongo.db.rewards.find_one({'user_id': current_user['_id']})
+            # First visit: create the rewards record
             if not rewards_record:
-                # Create initial rewards record
-                rewards_record = {
-                    '_id': ObjectId(),
-                    'user_id': current_user['_id'],
-                    'streak': 0,
-                    'last_active_date': None,
-                    'created_at': datetime.utcnow(),
-                    'updated_at': datetime.utcnow()
-                }
-                mongo.db.rewards.insert_one(rewards_record)
+                rewards_record = mongo.db.rewards.find_one_and_update(
+                    {'user_id': current_user['_id']},
+                    {'$setOnInsert': {
+                        'streak': 0,
+                        'last_active_date': None,
+                        'created_at': now,
+                        'updated_at': now
+                    }},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
 
             # Get current streak and last active date (don't update just by viewing rewards)
             current_streak = rewards_record.get('streak', 0)
@@ -177,11 +224,10 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
 
             # Check for streak milestone rewards (with error handling)
             try:
-                _check_and_award_streak_milestones(mongo, current_user, current_streak, user)
-                # Get updated user data (in case FC balance was updated)
-                user = mongo.db.users.find_one({'_id': current_user['_id']})
-            except Exception as e:
-                print(f"Error checking streak milestones: {str(e)}")
+                # Apply any awarded balance and flags locally instead of re-reading the user
+                user.update(_check_and_award_streak_milestones(mongo, current_user, current_streak, user, now))
+            except Exception:
+                logger.exception("Error checking streak milestones")
                 # Continue without failing the entire request
             
             # Calculate next milestone
@@ -195,20 +241,19 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
 
             # Get active benefits (with error handling)
             try:
-                active_benefits = _get_active_benefits(user)
-            except Exception as e:
-                print(f"Error getting active benefits: {str(e)}")
+                active_benefits = _get_active_benefits(user, now)
+            except Exception:
+                logger.exception("Error getting active benefits")
                 active_benefits = []
             
             # Get earning opportunities (with error handling)
             try:
-                earning_opportunities = _get_earning_opportunities(user)
-            except Exception as e:
-                print(f"Error getting earning opportunities: {str(e)}")
+                earning_opportunities = _get_earning_opportunities(user, current_streak)
+            except Exception:
+                logger.exception("Error getting earning opportunities")
                 earning_opportunities = []
 
             # Get entry streak information
-            entry_streak_record = mongo.db.entry_streaks.find_one({'user_id': current_user['_id']})
             entry_streak = entry_streak_record.get('current_streak', 0) if entry_streak_record else 0
             
             # Calculate progress metrics
@@ -221,7 +266,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                     'streak': current_streak,
                     'entry_streak': entry_streak,
                     'next_milestone': next_milestone,
-                    'last_active_date': rewards_record.get('last_active_date', datetime.utcnow()).isoformat() + 'Z',
+                    'last_active_date': (rewards_record.get('last_active_date') or now).isoformat() + 'Z',
                     'active_benefits': active_benefits,
                     'earned_bonuses': {
                         'earned_7day_streak_bonus': user.get('earned_7day_streak_bonus', False),
@@ -243,7 +288,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             })
 
         except Exception as e:
-            print(f"Error in get_rewards_dashboard: {str(e)}")
+            logger.exception("Error in get_rewards_dashboard")
             return jsonify({
                 'success': False,
                 'message': 'Failed to retrieve rewards dashboard',
@@ -304,23 +349,24 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 })
             except Exception as cleanup_error:
                 # Don't fail the request if cleanup fails
-                print(f"Activity tracking cleanup error: {str(cleanup_error)}")
+                logger.warning("Activity tracking cleanup error: %s", cleanup_error)
             
-            # Get or create rewards record
-            rewards_record = mongo.db.rewards.find_one({'user_id': current_user['_id']})
-            if not rewards_record:
-                rewards_record = {
-                    '_id': ObjectId(),
-                    'user_id': current_user['_id'],
+            # Get the rewards record, creating it with today's activity on first use. An upsert,
+            # so concurrent first requests cannot both insert into the unique user_id index
+            rewards_record = mongo.db.rewards.find_one_and_update(
+                {'user_id': current_user['_id']},
+                {'$setOnInsert': {
                     'streak': 1,
-                    'last_active_date': datetime.utcnow(),
-                    'created_at': datetime.utcnow(),
-                    'updated_at': datetime.utcnow()
-                }
-                mongo.db.rewards.insert_one(rewards_record)
-            else:
+                    'last_active_date': current_time,
+                    'created_at': current_time,
+                    'updated_at': current_time
+                }},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            if rewards_record:
                 # Calculate streak based on actual activity tracking
-                today = datetime.utcnow().date()
+                today = current_time.date()
                 last_active = rewards_record.get('last_active_date')
                 current_streak = rewards_record.get('streak', 0)
                 
@@ -347,15 +393,14 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                     {
                         '$set': {
                             'streak': current_streak,
-                            'last_active_date': datetime.utcnow(),
-                            'updated_at': datetime.utcnow()
+                            'last_active_date': current_time,
+                            'updated_at': current_time
                         }
                     }
                 )
 
-            # Check for exploration bonuses
-            user = mongo.db.users.find_one({'_id': current_user['_id']})
-            _check_and_award_exploration_bonuses(mongo, current_user, action, module, user)
+            # Check for exploration bonuses against the user token_required already loaded
+            _check_and_award_exploration_bonuses(mongo, current_user, action, module, current_user, current_time)
 
             return jsonify({
                 'success': True,
@@ -363,7 +408,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             })
 
         except Exception as e:
-            print(f"Error in track_user_activity: {str(e)}")
+            logger.exception("Error in track_user_activity")
             return jsonify({
                 'success': False,
                 'message': 'Failed to track activity',
@@ -376,6 +421,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
         """Redeem FC reward for exclusive benefits"""
         try:
             data = request.get_json()
+            now = datetime.utcnow()
             
             # Validate required fields
             if 'reward_id' not in data:
@@ -396,15 +442,15 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             reward_config = REWARD_CONFIG[reward_id]
             cost = reward_config['cost']
             
-            # Get user data
-            user = mongo.db.users.find_one({'_id': current_user['_id']})
+            # token_required already loaded the full user document
+            user = current_user
             current_balance = user.get('ficoreCreditBalance', 0.0)
             is_subscribed = user.get('isSubscribed', False)
             
             # Check if subscription is actually active
             if is_subscribed:
                 end_date = user.get('subscriptionEndDate')
-                if end_date and end_date <= datetime.utcnow():
+                if end_date and end_date <= now:
                     is_subscribed = False
             
             # Check if reward requires subscription
@@ -437,13 +483,25 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                     'message': 'You already have an active benefit of this type'
                 }), 400
 
-            # Deduct credits using existing credits system
-            from datetime import datetime
-            new_balance = current_balance - cost
-            mongo.db.users.update_one(
-                {'_id': current_user['_id']},
-                {'$set': {'ficoreCreditBalance': new_balance}}
+            # Deduct credits atomically; the balance guard rejects a concurrent overspend
+            updated_user = mongo.db.users.find_one_and_update(
+                {'_id': current_user['_id'], 'ficoreCreditBalance': {'$gte': cost}},
+                {'$inc': {'ficoreCreditBalance': -cost}},
+                projection={'ficoreCreditBalance': 1},
+                return_document=ReturnDocument.AFTER
             )
+            if not updated_user:
+                return jsonify({
+                    'success': False,
+                    'message': 'Insufficient FiCore Credits',
+                    'data': {
+                        'current_balance': current_balance,
+                        'required_amount': cost,
+                        'shortfall': max(cost - current_balance, 0)
+                    }
+                }), 402  # Payment Required
+            new_balance = updated_user.get('ficoreCreditBalance', 0.0)
+            current_balance = new_balance + cost
 
             # Create transaction record
             transaction = {
@@ -456,7 +514,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 'balanceBefore': current_balance,
                 'balanceAfter': new_balance,
                 'status': 'completed',
-                'createdAt': datetime.utcnow(),
+                'createdAt': now,
                 'metadata': {
                     'reward_id': reward_id,
                     'reward_name': reward_config['name'],
@@ -466,13 +524,13 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             mongo.db.credit_transactions.insert_one(transaction)
 
             # Apply reward benefit
-            benefit_applied = _apply_reward_benefit(mongo, current_user['_id'], reward_config)
+            benefit_applied = _apply_reward_benefit(mongo, current_user['_id'], reward_config, now)
             
             if not benefit_applied:
                 # Rollback the credit deduction if benefit application fails
                 mongo.db.users.update_one(
                     {'_id': current_user['_id']},
-                    {'$set': {'ficoreCreditBalance': current_balance}}
+                    {'$inc': {'ficoreCreditBalance': cost}}
                 )
                 # Remove the transaction record
                 mongo.db.credit_transactions.delete_one({'_id': transaction['_id']})
@@ -496,7 +554,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             })
 
         except Exception as e:
-            print(f"Error in redeem_reward: {str(e)}")
+            logger.exception("Error in redeem_reward")
             return jsonify({
                 'success': False,
                 'message': 'Failed to redeem reward',
@@ -531,21 +589,23 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             today = now.date()
             today_datetime = datetime.combine(today, datetime.min.time())
             
-            entry_streak_record = mongo.db.entry_streaks.find_one({'user_id': current_user['_id']})
-            
-            if not entry_streak_record:
-                entry_streak_record = {
-                    '_id': ObjectId(),
-                    'user_id': current_user['_id'],
+            # An upsert, so concurrent first entries cannot both insert into the unique user_id index;
+            # the record as it was before this request is returned, or None if this request created it
+            entry_streak_record = mongo.db.entry_streaks.find_one_and_update(
+                {'user_id': current_user['_id']},
+                {'$setOnInsert': {
                     'current_streak': 1,
                     'last_entry_date': today_datetime,
                     'longest_streak': 1,
                     'created_at': now,
                     'updated_at': now
-                }
-                mongo.db.entry_streaks.insert_one(entry_streak_record)
-                current_streak = 1
-            else:
+                }},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            
+            current_streak = 1
+            if entry_streak_record:
                 last_entry_date = entry_streak_record.get('last_entry_date')
                 current_streak = entry_streak_record.get('current_streak', 0)
                 
@@ -582,9 +642,8 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                     }
                 )
 
-            # Check for entry streak milestones (100-day discount)
-            user = mongo.db.users.find_one({'_id': current_user['_id']})
-            _check_and_award_entry_streak_milestones(mongo, current_user, current_streak, user)
+            # Check for entry streak milestones (100-day discount) against the user token_required already loaded
+            _check_and_award_entry_streak_milestones(mongo, current_user, current_streak, current_user, now)
 
             return jsonify({
                 'success': True,
@@ -601,7 +660,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             })
 
         except Exception as e:
-            print(f"Error in track_entry_creation: {str(e)}")
+            logger.exception("Error in track_entry_creation")
             return jsonify({
                 'success': False,
                 'message': 'Failed to track entry creation',
@@ -613,51 +672,31 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
     def get_available_rewards(current_user):
         """Get list of available rewards with costs and availability"""
         try:
-            # Get user data
-            user = mongo.db.users.find_one({'_id': current_user['_id']})
+            # token_required already loaded the full user document
+            user = current_user
+            now = datetime.utcnow()
             current_balance = user.get('ficoreCreditBalance', 0.0)
             is_subscribed = user.get('isSubscribed', False)
             
             # Check if subscription is actually active
             if is_subscribed:
                 end_date = user.get('subscriptionEndDate')
-                if end_date and end_date <= datetime.utcnow():
+                if end_date and end_date <= now:
                     is_subscribed = False
             
-            # Build available rewards list
+            # Build available rewards list; subscriber-only rewards are shown locked to non-subscribers
             available_rewards = []
-            subscriber_exclusive_rewards = []
+            subscriber_exclusive_rewards = [] if is_subscribed else LOCKED_SUBSCRIBER_REWARDS
             
-            for reward_id, config in REWARD_CONFIG.items():
-                is_subscriber_only = config.get('subscriber_only', False)
-                
-                # Skip subscriber-only rewards for non-subscribers
+            for reward_id, config, template, is_subscriber_only in REWARD_TEMPLATES:
                 if is_subscriber_only and not is_subscribed:
-                    # Add to subscriber exclusive list for display purposes
-                    reward_data = {
-                        'id': reward_id,
-                        'name': config['name'],
-                        'description': config['description'],
-                        'cost': config['cost'],
-                        'category': config['category'],
-                        'is_available': False,
-                        'insufficient_credits': False,
-                        'has_active_benefit': False,
-                        'subscriber_only': True,
-                        'requires_subscription': True
-                    }
-                    subscriber_exclusive_rewards.append(reward_data)
                     continue
                 
                 is_available = current_balance >= config['cost']
                 has_conflict = _has_conflicting_benefit(user, config)
                 
                 reward_data = {
-                    'id': reward_id,
-                    'name': config['name'],
-                    'description': config['description'],
-                    'cost': config['cost'],
-                    'category': config['category'],
+                    **template,
                     'is_available': is_available and not has_conflict,
                     'insufficient_credits': not is_available,
                     'has_active_benefit': has_conflict,
@@ -683,7 +722,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             })
 
         except Exception as e:
-            print(f"Error in get_available_rewards: {str(e)}")
+            logger.exception("Error in get_available_rewards")
             return jsonify({
                 'success': False,
                 'message': 'Failed to retrieve available rewards',
@@ -691,127 +730,70 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             }), 500
 
     # Helper functions
-    def _get_active_benefits(user):
-        """Get user's active benefits"""
+    def _check_and_award_streak_milestones(mongo, current_user, streak, user, now=None):
+        """Check and award streak milestone bonuses.
+        Returns the user fields that changed (balance and earned flags) so callers can skip a re-read."""
+        awarded = {}
         try:
-            active_benefits = []
-            
-            # Check for temporary discount
-            if user.get('hasTemporaryDiscount', False):
-                discount_expires = user.get('tempDiscountExpires')
-                if discount_expires and datetime.utcnow() < discount_expires:
-                    active_benefits.append({
-                        'type': 'temp_discount',
-                        'name': '50% Off All FC Costs',
-                        'description': f"{user.get('discountPercentage', 50)}% discount on all features",
-                        'expires_at': discount_expires.isoformat() + 'Z' if discount_expires else None
-                    })
-            
-            # Check for free entries
-            if user.get('freeEntriesCount', 0) > 0:
-                active_benefits.append({
-                    'type': 'free_entries',
-                    'name': 'Free Income/Expense Entries',
-                    'description': f"{user.get('freeEntriesCount', 0)} free entries remaining",
-                    'count': user.get('freeEntriesCount', 0)
-                })
-            
-            # Check for free PDF exports
-            if user.get('hasFreePdfExports', False):
-                pdf_expires = user.get('freePdfExportsExpires')
-                if pdf_expires and datetime.utcnow() < pdf_expires:
-                    active_benefits.append({
-                        'type': 'free_pdf_exports',
-                        'name': 'Free PDF Exports',
-                        'description': 'Unlimited PDF exports',
-                        'expires_at': pdf_expires.isoformat() + 'Z' if pdf_expires else None
-                    })
-            
-            return active_benefits
-        except Exception as e:
-            print(f"Error getting active benefits: {str(e)}")
-            return []
+            pending = [
+                (milestone, config)
+                for milestone, config in EARNING_CONFIG['streak_milestones'].items()
+                if streak >= milestone and not user.get(config['flag'], False)
+            ]
+            if not pending:
+                return awarded
 
-    def _get_earning_opportunities(user):
-        """Get available earning opportunities for the user"""
-        try:
-            opportunities = []
-            
-            # Check for unclaimed exploration bonuses
-            for bonus_key, config in EARNING_CONFIG['exploration_bonuses'].items():
-                if not user.get(config['flag'], False):
-                    opportunities.append({
-                        'type': 'exploration',
-                        'key': bonus_key,
-                        'name': bonus_key.replace('_', ' ').title(),
-                        'amount': config['amount'],
-                        'description': f"Earn {config['amount']} FCs by exploring this feature"
-                    })
-            
-            # Check for unclaimed streak milestones
-            current_streak = user.get('current_streak', 0)
-            for milestone, config in EARNING_CONFIG['streak_milestones'].items():
-                if current_streak < milestone and not user.get(config['flag'], False):
-                    days_needed = milestone - current_streak
-                    opportunities.append({
-                        'type': 'streak_milestone',
-                        'key': f'streak_{milestone}d',
-                        'name': f'{milestone}-Day Streak Milestone',
-                        'amount': config['amount'],
-                        'description': f"Earn {config['amount']} FCs by maintaining a {milestone}-day streak ({days_needed} more days needed)"
-                    })
-                    break  # Only show the next milestone
-            
-            return opportunities
-        except Exception as e:
-            print(f"Error getting earning opportunities: {str(e)}")
-            return []
+            # Credit every newly reached milestone and set their flags in one write.
+            # The flag guards stop a concurrent request from awarding the same milestones twice.
+            total_amount = sum(config['amount'] for _, config in pending)
+            flags = {config['flag']: True for _, config in pending}
+            updated_user = mongo.db.users.find_one_and_update(
+                {'_id': current_user['_id'], **{flag: {'$ne': True} for flag in flags}},
+                {
+                    '$inc': {'ficoreCreditBalance': total_amount},
+                    '$set': flags
+                },
+                projection={'ficoreCreditBalance': 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if not updated_user:
+                return awarded
 
-    def _check_and_award_streak_milestones(mongo, current_user, streak, user):
-        """Check and award streak milestone bonuses"""
-        try:
-            for milestone, config in EARNING_CONFIG['streak_milestones'].items():
-                if streak >= milestone and not user.get(config['flag'], False):
-                    # Award milestone bonus
-                    current_balance = user.get('ficoreCreditBalance', 0.0)
-                    new_balance = current_balance + config['amount']
-                    
-                    # Update user balance and flag
-                    mongo.db.users.update_one(
-                        {'_id': current_user['_id']},
-                        {
-                            '$set': {
-                                'ficoreCreditBalance': new_balance,
-                                config['flag']: True
-                            }
-                        }
-                    )
-                    
-                    # Create transaction record
-                    transaction = {
-                        '_id': ObjectId(),
-                        'userId': current_user['_id'],
-                        'type': 'credit',
-                        'amount': config['amount'],
-                        'description': f'Streak milestone bonus - {milestone} days',
-                        'operation': f'streak_milestone_{milestone}d',
-                        'balanceBefore': current_balance,
-                        'balanceAfter': new_balance,
-                        'status': 'completed',
-                        'createdAt': datetime.utcnow(),
-                        'metadata': {
-                            'milestone': milestone,
-                            'streak_bonus': True
-                        }
+            # Record one transaction per milestone, chaining the balances up to the final one
+            final_balance = updated_user.get('ficoreCreditBalance', 0.0)
+            current_balance = final_balance - total_amount
+            now = now or datetime.utcnow()
+            transactions = []
+            for milestone, config in pending:
+                new_balance = current_balance + config['amount']
+                transactions.append({
+                    '_id': ObjectId(),
+                    'userId': current_user['_id'],
+                    'type': 'credit',
+                    'amount': config['amount'],
+                    'description': f'Streak milestone bonus - {milestone} days',
+                    'operation': f'streak_milestone_{milestone}d',
+                    'balanceBefore': current_balance,
+                    'balanceAfter': new_balance,
+                    'status': 'completed',
+                    'createdAt': now,
+                    'metadata': {
+                        'milestone': milestone,
+                        'streak_bonus': True
                     }
-                    mongo.db.credit_transactions.insert_one(transaction)
-                    
-                    print(f"Awarded {config['amount']} FCs for {milestone}-day streak milestone")
-        except Exception as e:
-            print(f"Error awarding streak milestones: {str(e)}")
+                })
+                current_balance = new_balance
+                logger.info("Awarded %s FCs for %s-day streak milestone", config['amount'], milestone)
+            mongo.db.credit_transactions.insert_many(transactions, ordered=False)
+            awarded.update(flags)
+            awarded['ficoreCreditBalance'] = final_balance
+        except Exception:
+            logger.exception("Error awarding streak milestones")
+        return awarded
 
-    def _check_and_award_exploration_bonuses(mongo, current_user, action, module, user):
+    def _check_and_award_exploration_bonuses(mongo, current_user, action, module, user, now=None):
         """Check and award exploration bonuses"""
+        now = now or datetime.utcnow()
         try:
             bonus_key = None
             
@@ -831,20 +813,20 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 config = EARNING_CONFIG['exploration_bonuses'][bonus_key]
                 
                 if not user.get(config['flag'], False):
-                    # Award exploration bonus
-                    current_balance = user.get('ficoreCreditBalance', 0.0)
-                    new_balance = current_balance + config['amount']
-                    
-                    # Update user balance and flag
-                    mongo.db.users.update_one(
-                        {'_id': current_user['_id']},
+                    # Credit the bonus and set the flag in one write; the flag guard stops a double award
+                    updated_user = mongo.db.users.find_one_and_update(
+                        {'_id': current_user['_id'], config['flag']: {'$ne': True}},
                         {
-                            '$set': {
-                                'ficoreCreditBalance': new_balance,
-                                config['flag']: True
-                            }
-                        }
+                            '$inc': {'ficoreCreditBalance': config['amount']},
+                            '$set': {config['flag']: True}
+                        },
+                        projection={'ficoreCreditBalance': 1},
+                        return_document=ReturnDocument.AFTER
                     )
+                    if not updated_user:
+                        return
+                    new_balance = updated_user.get('ficoreCreditBalance', 0.0)
+                    current_balance = new_balance - config['amount']
                     
                     # Create transaction record
                     transaction = {
@@ -857,7 +839,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                         'balanceBefore': current_balance,
                         'balanceAfter': new_balance,
                         'status': 'completed',
-                        'createdAt': datetime.utcnow(),
+                        'createdAt': now,
                         'metadata': {
                             'exploration_bonus': True,
                             'bonus_type': bonus_key
@@ -865,18 +847,19 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                     }
                     mongo.db.credit_transactions.insert_one(transaction)
                     
-                    print(f"Awarded {config['amount']} FCs for {bonus_key} exploration bonus")
-        except Exception as e:
-            print(f"Error awarding exploration bonuses: {str(e)}")
+                    logger.info("Awarded %s FCs for %s exploration bonus", config['amount'], bonus_key)
+        except Exception:
+            logger.exception("Error awarding exploration bonuses")
 
-    def _check_and_award_entry_streak_milestones(mongo, current_user, entry_streak, user):
+    def _check_and_award_entry_streak_milestones(mongo, current_user, entry_streak, user, now=None):
         """Check and award entry streak milestones (100-day subscription discount)"""
+        now = now or datetime.utcnow()
         try:
             for milestone, config in EARNING_CONFIG['entry_streak_milestones'].items():
                 if entry_streak >= milestone and not user.get(config['flag'], False):
                     # Award subscription discount
                     discount_percentage = config['discount_percentage']
-                    expiry_date = datetime.utcnow() + timedelta(days=365)  # 1 year to use
+                    expiry_date = now + timedelta(days=365)  # 1 year to use
                     
                     # Create discount record
                     discount_record = {
@@ -884,7 +867,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                         'user_id': current_user['_id'],
                         'discount_type': 'subscription',
                         'discount_percentage': discount_percentage,
-                        'created_at': datetime.utcnow(),
+                        'created_at': now,
                         'expires_at': expiry_date,
                         'used': False,
                         'milestone_achievement': True,
@@ -909,13 +892,15 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                         {'$set': user_updates}
                     )
                     
-                    print(f"Awarded {discount_percentage}% subscription discount for {milestone}-day entry streak milestone")
-        except Exception as e:
-            print(f"Error awarding entry streak milestones: {str(e)}")
+                    logger.info("Awarded %s%% subscription discount for %s-day entry streak milestone", discount_percentage, milestone)
+        except Exception:
+            logger.exception("Error awarding entry streak milestones")
 
-    def _get_active_benefits(user):
+    def _get_active_benefits(user, now=None):
         """Get user's currently active benefits"""
+        now = now or datetime.utcnow()
         active_benefits = {}
+        expired_fields = {}
         
         # Check free entries
         free_entries = user.get('free_income_expense_entries', 0)
@@ -925,47 +910,39 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
         # Check temporary discount
         if user.get('temp_fc_discount_active', False):
             expiry = user.get('temp_fc_discount_expiry')
-            if expiry and datetime.utcnow() < expiry:
+            if expiry and now < expiry:
                 active_benefits['temp_fc_discount'] = {
                     'percentage': user.get('temp_fc_discount_percentage', 0),
                     'expiry': expiry.isoformat() + 'Z'
                 }
             else:
-                # Expired, clean up
-                mongo.db.users.update_one(
-                    {'_id': user['_id']},
-                    {
-                        '$set': {
-                            'temp_fc_discount_active': False,
-                            'temp_fc_discount_percentage': 0,
-                            'temp_fc_discount_expiry': None
-                        }
-                    }
-                )
+                expired_fields.update({
+                    'temp_fc_discount_active': False,
+                    'temp_fc_discount_percentage': 0,
+                    'temp_fc_discount_expiry': None
+                })
         
         # Check free PDF exports
         if user.get('free_pdf_export_active', False):
             expiry = user.get('free_pdf_export_expiry')
-            if expiry and datetime.utcnow() < expiry:
+            if expiry and now < expiry:
                 active_benefits['free_pdf_exports'] = {
                     'expiry': expiry.isoformat() + 'Z'
                 }
             else:
-                # Expired, clean up
-                mongo.db.users.update_one(
-                    {'_id': user['_id']},
-                    {
-                        '$set': {
-                            'free_pdf_export_active': False,
-                            'free_pdf_export_expiry': None
-                        }
-                    }
-                )
+                expired_fields.update({
+                    'free_pdf_export_active': False,
+                    'free_pdf_export_expiry': None
+                })
+        
+        # Clean up every expired benefit in a single write
+        if expired_fields:
+            mongo.db.users.update_one({'_id': user['_id']}, {'$set': expired_fields})
         
         return active_benefits
 
-    def _get_earning_opportunities(user):
-        """Get available earning opportunities for the user"""
+    def _get_earning_opportunities(user, current_streak):
+        """Get available earning opportunities for the user, given their current streak"""
         opportunities = []
         
         # Check exploration bonuses
@@ -980,9 +957,6 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 opportunities.append(opportunity)
         
         # Check streak milestones
-        rewards_record = mongo.db.rewards.find_one({'user_id': user['_id']})
-        current_streak = rewards_record.get('streak', 0) if rewards_record else 0
-        
         for milestone, config in EARNING_CONFIG['streak_milestones'].items():
             if not user.get(config['flag'], False) and current_streak < milestone:
                 days_needed = milestone - current_streak
@@ -998,17 +972,12 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
 
     def _has_conflicting_benefit(user, reward_config):
         """Check if user has conflicting active benefit"""
-        benefit_type = reward_config['benefit_type']
-        
-        if benefit_type == 'temp_discount':
-            return user.get('temp_fc_discount_active', False)
-        elif benefit_type == 'free_pdf_exports':
-            return user.get('free_pdf_export_active', False)
-        
-        return False
+        active_flag = CONFLICTING_BENEFIT_FLAGS.get(reward_config['benefit_type'])
+        return user.get(active_flag, False) if active_flag else False
 
-    def _apply_reward_benefit(mongo, user_id, reward_config):
+    def _apply_reward_benefit(mongo, user_id, reward_config, now=None):
         """Apply the reward benefit to user account"""
+        now = now or datetime.utcnow()
         try:
             benefit_type = reward_config['benefit_type']
             
@@ -1017,7 +986,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             if benefit_type == 'free_entries':
                 amount = reward_config['benefit_amount']
                 # Add to existing free entries instead of replacing
-                user = mongo.db.users.find_one({'_id': user_id})
+                user = mongo.db.users.find_one({'_id': user_id}, {'free_income_expense_entries': 1})
                 current_entries = user.get('free_income_expense_entries', 0)
                 update_data['free_income_expense_entries'] = current_entries + amount
             elif benefit_type == 'temp_discount':
@@ -1025,13 +994,13 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 update_data.update({
                     'temp_fc_discount_active': True,
                     'temp_fc_discount_percentage': amount,
-                    'temp_fc_discount_expiry': datetime.utcnow() + timedelta(hours=24)
+                    'temp_fc_discount_expiry': now + timedelta(hours=24)
                 })
             elif benefit_type == 'trial_extension':
                 amount = reward_config['benefit_amount']
                 # Extend trial by specified days
-                user = mongo.db.users.find_one({'_id': user_id})
-                current_expiry = user.get('trial_expiry_date', datetime.utcnow())
+                user = mongo.db.users.find_one({'_id': user_id}, {'trial_expiry_date': 1})
+                current_expiry = user.get('trial_expiry_date', now)
                 if isinstance(current_expiry, str):
                     current_expiry = datetime.fromisoformat(current_expiry.replace('Z', ''))
                 new_expiry = current_expiry + timedelta(days=amount)
@@ -1040,12 +1009,12 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 amount = reward_config['benefit_amount']
                 update_data.update({
                     'free_pdf_export_active': True,
-                    'free_pdf_export_expiry': datetime.utcnow() + timedelta(days=amount)
+                    'free_pdf_export_expiry': now + timedelta(days=amount)
                 })
             elif benefit_type == 'unlock_feature':
                 # Unlock premium features for subscribers
                 feature_key = reward_config['feature_key']
-                user = mongo.db.users.find_one({'_id': user_id})
+                user = mongo.db.users.find_one({'_id': user_id}, {'unlocked_features': 1})
                 current_features = user.get('unlocked_features', {})
                 current_features[feature_key] = True
                 update_data['unlocked_features'] = current_features
@@ -1053,20 +1022,20 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 # Add items like priority support tokens
                 item_key = reward_config['item_key']
                 item_amount = reward_config['item_amount']
-                user = mongo.db.users.find_one({'_id': user_id})
+                user = mongo.db.users.find_one({'_id': user_id}, {item_key: 1})
                 current_amount = user.get(item_key, 0)
                 update_data[item_key] = current_amount + item_amount
             elif benefit_type == 'increase_limit':
                 # Increase limits like storage
                 limit_key = reward_config['limit_key']
                 limit_amount = reward_config['limit_amount']
-                user = mongo.db.users.find_one({'_id': user_id})
+                user = mongo.db.users.find_one({'_id': user_id}, {limit_key: 1})
                 current_limit = user.get(limit_key, 0)
                 update_data[limit_key] = current_limit + limit_amount
             elif benefit_type == 'subscription_discount':
                 # Create subscription discount coupon
                 discount_percentage = reward_config['discount_percentage']
-                expiry_date = datetime.utcnow() + timedelta(days=90)  # 90 days to use
+                expiry_date = now + timedelta(days=90)  # 90 days to use
                 
                 # Create discount record
                 discount_record = {
@@ -1074,7 +1043,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                     'user_id': user_id,
                     'discount_type': 'subscription',
                     'discount_percentage': discount_percentage,
-                    'created_at': datetime.utcnow(),
+                    'created_at': now,
                     'expires_at': expiry_date,
                     'used': False,
                     'reward_redemption': True
@@ -1082,7 +1051,7 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 mongo.db.subscription_discounts.insert_one(discount_record)
                 
                 # Add discount ID to user record
-                user = mongo.db.users.find_one({'_id': user_id})
+                user = mongo.db.users.find_one({'_id': user_id}, {'available_subscription_discounts': 1})
                 current_discounts = user.get('available_subscription_discounts', [])
                 current_discounts.append(str(discount_record['_id']))
                 update_data['available_subscription_discounts'] = current_discounts
@@ -1095,8 +1064,8 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 return result.modified_count > 0
             
             return False
-        except Exception as e:
-            print(f"Error applying reward benefit: {str(e)}")
+        except Exception:
+            logger.exception("Error applying reward benefit")
             return False
 
     def _get_benefit_details(reward_config):
@@ -1185,8 +1154,8 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
             metrics['exploration_progress'] = exploration_items
             return metrics
             
-        except Exception as e:
-            print(f"Error calculating progress metrics: {str(e)}")
+        except Exception:
+            logger.exception("Error calculating progress metrics")
             return {
                 'streak_progress': {'current': current_streak, 'next_milestone': 7, 'progress_percentage': 0, 'completed': False},
                 'exploration_progress': []
@@ -1207,13 +1176,13 @@ def init_rewards_blueprint(mongo, token_required, serialize_doc, limiter=None):
                 'timestamp',
                 expireAfterSeconds=7200  # 2 hours in seconds
             )
-        except Exception as e:
-            print(f"Error creating activity tracking indexes: {str(e)}")
+        except Exception:
+            logger.exception("Error creating activity tracking indexes")
     
     # Ensure indexes are created when blueprint is initialized
     try:
         _ensure_activity_tracking_indexes(mongo)
-    except Exception as e:
-        print(f"Error during index initialization: {str(e)}")
+    except Exception:
+        logger.exception("Error during index initialization")
 
     return rewards_bp
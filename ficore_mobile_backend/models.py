@@ -134,6 +134,33 @@ class DatabaseSchema:
             {'keys': [('createdAt', -1)], 'name': 'created_at_desc'},
         ]
     
+    # ==================== INCOME_ROLLUPS COLLECTION ====================
+    
+    @staticmethod
+    def get_income_rollup_schema() -> Dict[str, Any]:
+        """
+        Schema for income_rollups collection.
+        Stores per-user monthly income sums by category and source, maintained on income writes.
+        """
+        return {
+            '_id': ObjectId,  # Auto-generated MongoDB ID
+            'userId': ObjectId,  # Required, reference to users._id
+            'month': str,  # Required, month key in format YYYY-MM
+            'category': str,  # Required, income category ('Unknown' if missing or empty)
+            'source': str,  # Required, income source ('Unknown' if missing or empty)
+            'sum': float,  # Sum of income amounts in this bucket
+            'count': int,  # Number of incomes in this bucket
+            'min': float,  # Smallest income amount in this bucket
+            'max': float,  # Largest income amount in this bucket
+        }
+    
+    @staticmethod
+    def get_income_rollup_indexes() -> List[Dict[str, Any]]:
+        """Define indexes for income_rollups collection."""
+        return [
+            {'keys': [('userId', 1), ('month', 1), ('category', 1), ('source', 1)], 'unique': True, 'name': 'user_month_category_source_unique'},
+        ]
+    
     # ==================== EXPENSES COLLECTION ====================
     
     @staticmethod
@@ -498,6 +525,8 @@ class DatabaseSchema:
             'sellingPrice': float,  # Required, selling price per unit
             'currentStock': int,  # Current stock quantity
             'minimumStock': int,  # Minimum stock alert level
+            'isLowStock': bool,  # Materialized currentStock <= minimumStock, kept in step on every stock write
+            'profitMargin': float,  # Materialized (sellingPrice - costPrice) / sellingPrice * 100, rounded to 2 decimals
             'maximumStock': Optional[int],  # Maximum stock level
             'unit': str,  # Required: 'pieces', 'kg', 'liters', etc.
             'supplier': Optional[str],  # Supplier name
@@ -516,14 +545,77 @@ class DatabaseSchema:
     def get_inventory_item_indexes() -> List[Dict[str, Any]]:
         """Define indexes for inventory_items collection."""
         return [
-            {'keys': [('userId', 1), ('itemName', 1)], 'name': 'user_item_name'},
-            {'keys': [('userId', 1), ('category', 1)], 'name': 'user_category'},
-            {'keys': [('userId', 1), ('status', 1)], 'name': 'user_status'},
+            {'keys': [('userId', 1), ('itemName', 1)], 'unique': True, 'name': 'user_item_name'},
+            # Equality filter + itemName sort for the filtered item lists
+            {'keys': [('userId', 1), ('category', 1), ('itemName', 1)], 'name': 'user_category_item_name'},
+            {'keys': [('userId', 1), ('status', 1), ('itemName', 1)], 'name': 'user_status_item_name'},
+            {'keys': [('userId', 1), ('status', 1), ('category', 1), ('itemName', 1)],
+             'name': 'user_status_category_item_name'},
+            {'keys': [('userId', 1), ('isLowStock', 1), ('itemName', 1)], 'name': 'user_low_stock_item_name'},
+            # Low stock report - isLowStock equality + currentStock sort, optionally narrowed by category
+            {'keys': [('userId', 1), ('isLowStock', 1), ('currentStock', 1)], 'name': 'user_low_stock_current_stock'},
+            {'keys': [('userId', 1), ('category', 1), ('isLowStock', 1), ('currentStock', 1)],
+             'name': 'user_category_low_stock_current_stock'},
             {'keys': [('userId', 1), ('currentStock', 1)], 'name': 'user_stock'},
+            # Item search - queries must include userId equality
+            {'keys': [('userId', 1), ('itemName', 'text'), ('itemCode', 'text'),
+                      ('description', 'text'), ('supplier', 'text')], 'name': 'user_item_search_text'},
             {'keys': [('itemCode', 1)], 'sparse': True, 'name': 'item_code'},
             {'keys': [('createdAt', -1)], 'name': 'created_at_desc'},
         ]
 
+    # ==================== INVENTORY_SUMMARY COLLECTION ====================
+    
+    @staticmethod
+    def get_inventory_summary_schema() -> Dict[str, Any]:
+        """
+        Schema for inventory_summary collection.
+        One document per user with inventory totals, rebuilt in the background after inventory writes.
+        Writes set stale first, so a summary read rebuilds it if the background rebuild never ran.
+        """
+        return {
+            '_id': ObjectId,  # Auto-generated MongoDB ID
+            'userId': ObjectId,  # Required, reference to users._id
+            'totalItems': int,  # Number of inventory items
+            'activeItems': int,  # Items with status 'active'
+            'lowStockItems': int,  # Items with currentStock <= minimumStock
+            'outOfStockItems': int,  # Items with currentStock <= 0
+            'totalValue': float,  # Sum of currentStock * costPrice
+            'totalStock': int,  # Sum of currentStock
+            'stale': bool,  # Set by inventory writes, cleared when a rebuild starts
+            'updatedAt': datetime,  # Last rebuild timestamp
+        }
+    
+    @staticmethod
+    def get_inventory_summary_indexes() -> List[Dict[str, Any]]:
+        """Define indexes for inventory_summary collection."""
+        return [
+            {'keys': [('userId', 1)], 'unique': True, 'name': 'user_unique'},
+        ]
+
+    # ==================== MOVEMENT_COUNTS COLLECTION ====================
+    
+    @staticmethod
+    def get_movement_count_schema() -> Dict[str, Any]:
+        """
+        Schema for movement_counts collection.
+        One document per user holding their inventory_movements count, kept with $inc on insert/delete.
+        Created by the first unfiltered movement listing and recounted there once a day.
+        """
+        return {
+            '_id': ObjectId,  # Auto-generated MongoDB ID
+            'userId': ObjectId,  # Required, reference to users._id
+            'count': int,  # Number of inventory_movements for the user
+            'recountedAt': datetime,  # When count was last recounted from inventory_movements
+        }
+    
+    @staticmethod
+    def get_movement_count_indexes() -> List[Dict[str, Any]]:
+        """Define indexes for movement_counts collection."""
+        return [
+            {'keys': [('userId', 1)], 'unique': True, 'name': 'user_unique'},
+        ]
+
     # ==================== INVENTORY_MOVEMENTS COLLECTION ====================
     
     @staticmethod
@@ -553,13 +645,63 @@ class DatabaseSchema:
     def get_inventory_movement_indexes() -> List[Dict[str, Any]]:
         """Define indexes for inventory_movements collection."""
         return [
+            {'keys': [('userId', 1), ('movementDate', -1), ('_id', -1)], 'name': 'user_date_id_desc'},
             {'keys': [('userId', 1), ('itemId', 1), ('movementDate', -1)], 'name': 'user_item_date_desc'},
-            {'keys': [('userId', 1), ('movementType', 1)], 'name': 'user_movement_type'},
+            {'keys': [('userId', 1), ('movementType', 1), ('movementDate', -1)], 'name': 'user_movement_type_date_desc'},
             {'keys': [('userId', 1), ('reason', 1)], 'name': 'user_reason'},
             {'keys': [('reference', 1)], 'sparse': True, 'name': 'reference'},
             {'keys': [('createdAt', -1)], 'name': 'created_at_desc'},
         ]
 
+    # ==================== REWARDS COLLECTION ====================
+    
+    @staticmethod
+    def get_reward_schema() -> Dict[str, Any]:
+        """
+        Schema for rewards collection.
+        One document per user holding their daily activity streak.
+        """
+        return {
+            '_id': ObjectId,  # Auto-generated MongoDB ID
+            'user_id': ObjectId,  # Required, reference to users._id
+            'streak': int,  # Consecutive active days
+            'last_active_date': Optional[datetime],  # Last day the user was active
+            'created_at': datetime,  # Record creation timestamp
+            'updated_at': datetime,  # Last update timestamp
+        }
+    
+    @staticmethod
+    def get_reward_indexes() -> List[Dict[str, Any]]:
+        """Define indexes for rewards collection."""
+        return [
+            {'keys': [('user_id', 1)], 'unique': True, 'name': 'user_unique'},
+        ]
+
+    # ==================== ENTRY_STREAKS COLLECTION ====================
+    
+    @staticmethod
+    def get_entry_streak_schema() -> Dict[str, Any]:
+        """
+        Schema for entry_streaks collection.
+        One document per user holding their income/expense entry streak.
+        """
+        return {
+            '_id': ObjectId,  # Auto-generated MongoDB ID
+            'user_id': ObjectId,  # Required, reference to users._id
+            'current_streak': int,  # Consecutive days with an entry
+            'longest_streak': int,  # Best streak so far
+            'last_entry_date': Optional[datetime],  # Last day an entry was created
+            'created_at': datetime,  # Record creation timestamp
+            'updated_at': datetime,  # Last update timestamp
+        }
+    
+    @staticmethod
+    def get_entry_streak_indexes() -> List[Dict[str, Any]]:
+        """Define indexes for entry_streaks collection."""
+        return [
+            {'keys': [('user_id', 1)], 'unique': True, 'name': 'user_unique'},
+        ]
+
 
 class DatabaseInitializer:
     """
@@ -585,6 +727,7 @@ class DatabaseInitializer:
         collections = {
             'users': self.schema.get_user_indexes(),
             'incomes': self.schema.get_income_indexes(),
+            'income_rollups': self.schema.get_income_rollup_indexes(),
             'expenses': self.schema.get_expense_indexes(),
             'credit_transactions': self.schema.get_credit_transaction_indexes(),
             'credit_requests': self.schema.get_credit_request_indexes(),
@@ -595,7 +738,11 @@ class DatabaseInitializer:
             'creditors': self.schema.get_creditor_indexes(),
             'creditor_transactions': self.schema.get_creditor_transaction_indexes(),
             'inventory_items': self.schema.get_inventory_item_indexes(),
+            'inventory_summary': self.schema.get_inventory_summary_indexes(),
             'inventory_movements': self.schema.get_inventory_movement_indexes(),
+            'movement_counts': self.schema.get_movement_count_indexes(),
+            'rewards': self.schema.get_reward_indexes(),
+            'entry_streaks': self.schema.get_entry_streak_indexes(),
         }
         
         results = {
@@ -627,6 +774,16 @@ class DatabaseInitializer:
                     
                     # Check if index already exists by name
                     if index_name and index_name in existing_indexes:
+                        if index_def.get('unique') and not existing_indexes[index_name].get('unique'):
+                            # Index was created before it became unique - rebuild it
+                            error_msg = self._rebuild_as_unique(collection, index_def)
+                            if error_msg:
+                                results['errors'].append(error_msg)
+                                print(f"  ✗ {error_msg}")
+                            else:
+                                results['indexes_created'].append(f"{collection_name}.{index_name}")
+                                print(f"  ✓ Rebuilt index '{index_name}' as unique on '{collection_name}'")
+                            continue
                         print(f"  ✓ Index '{index_name}' already exists on '{collection_name}'")
                         continue
                     
@@ -656,7 +813,14 @@ class DatabaseInitializer:
                         print(f"  ✓ Created index '{created_index_name}' on '{collection_name}'")
                     except Exception as index_error:
                         # Handle specific error cases
-                        if 'already exists' in str(index_error).lower() or 'duplicate key' in str(index_error).lower():
+                        if 'duplicate key' in str(index_error).lower():
+                            # Existing documents violate a unique index, so it was not built
+                            error_msg = (f"Failed to create unique index '{index_name}' on {collection_name}: "
+                                         f"existing documents have duplicate {[key for key, _ in index_keys]} values; "
+                                         f"remove the duplicates and run initialization again")
+                            results['errors'].append(error_msg)
+                            print(f"  ✗ {error_msg}")
+                        elif 'already exists' in str(index_error).lower():
                             print(f"  ✓ Index '{index_name}' already exists on '{collection_name}'")
                         else:
                             error_msg = f"Failed to create index '{index_name}' on {collection_name}: {str(index_error)}"
@@ -670,6 +834,60 @@ class DatabaseInitializer:
         
         return results
     
+    def _rebuild_as_unique(self, collection, index_def: Dict[str, Any]) -> Optional[str]:
+        """
+        Replace an existing non-unique index with its unique definition.
+        If existing documents violate the constraint, the non-unique index is restored.
+        
+        Args:
+            collection: PyMongo collection holding the index
+            index_def: Index definition from DatabaseSchema
+            
+        Returns:
+            str: Error message if the unique index could not be built, otherwise None
+        """
+        index_name = index_def['name']
+        collection.drop_index(index_name)
+        try:
+            collection.create_index(
+                index_def['keys'],
+                unique=True,
+                sparse=index_def.get('sparse', False),
+                name=index_name
+            )
+            return None
+        except Exception as index_error:
+            collection.create_index(
+                index_def['keys'],
+                sparse=index_def.get('sparse', False),
+                name=index_name
+            )
+            return f"Failed to make index '{index_name}' unique on {collection.name}: {str(index_error)}"
+    
+    def backfill_inventory_item_fields(self) -> int:
+        """
+        Populate materialized fields on inventory items created before they existed.
+        Safe to run multiple times - only touches items missing the fields.
+        
+        Returns:
+            int: Number of items updated
+        """
+        profit_margin = {'$cond': [
+            {'$gt': ['$sellingPrice', 0]},
+            {'$round': [{'$multiply': [
+                {'$divide': [{'$subtract': ['$sellingPrice', '$costPrice']}, '$sellingPrice']}, 100
+            ]}, 2]},
+            0
+        ]}
+        result = self.db.inventory_items.update_many(
+            {'$or': [{'isLowStock': {'$exists': False}}, {'profitMargin': {'$exists': False}}]},
+            [{'$set': {
+                'isLowStock': {'$ifNull': ['$isLowStock', {'$lte': ['$currentStock', '$minimumStock']}]},
+                'profitMargin': {'$ifNull': ['$profitMargin', profit_margin]}
+            }}]
+        )
+        return result.modified_count
+    
     def validate_collection_exists(self, collection_name: str) -> bool:
         """
         Check if a collection exists in the database.
@@ -0,0 +1,148 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from bson import ObjectId
+
+from ficore_mobile_backend.utils import income_rollups as ir
+
+
+class TestIncomeRollupTracker(unittest.TestCase):
+    def setUp(self):
+        self.mongo = MagicMock()
+        self.tracker = ir.IncomeRollupTracker(self.mongo)
+        self.user_id = ObjectId()
+
+    def row(self, **fields):
+        row = {'_id': ObjectId(), 'userId': self.user_id, 'month': '2026-03',
+               'category': 'Unknown', 'source': 'Salary', 'count': 2, 'min': 10.0, 'max': 50.0}
+        row.update(fields)
+        return row
+
+    def test_bucket_name(self):
+        self.assertEqual(ir.bucket_name('Salary'), 'Salary')
+        self.assertEqual(ir.bucket_name(''), 'Unknown')
+        self.assertEqual(ir.bucket_name(None), 'Unknown')
+
+    def test_apply_adds_income_with_extremes(self):
+        self.tracker.apply(self.user_id, {'amount': 50, 'dateReceived': datetime(2026, 3, 5),
+                                          'category': '', 'source': None})
+        self.mongo.db.income_rollups.update_one.assert_called_once_with(
+            {'userId': self.user_id, 'month': '2026-03', 'category': 'Unknown', 'source': 'Unknown'},
+            {'$inc': {'sum': 50.0, 'count': 1}, '$min': {'min': 50.0}, '$max': {'max': 50.0}},
+            upsert=True
+        )
+
+    def test_apply_skips_income_without_date(self):
+        self.tracker.apply(self.user_id, {'amount': 50, 'dateReceived': None})
+        self.mongo.db.income_rollups.update_one.assert_not_called()
+
+    def test_remove_extreme_recomputes_row_extremes(self):
+        row = self.row()
+        self.mongo.db.income_rollups.find_one_and_update.return_value = row
+        self.mongo.db.incomes.aggregate.return_value = [{'_id': None, 'min': 10.0, 'max': 20.0}]
+
+        self.tracker.apply(self.user_id, {'amount': 50, 'dateReceived': datetime(2026, 3, 5),
+                                          'category': None, 'source': 'Salary'}, -1)
+
+        match = self.mongo.db.incomes.aggregate.call_args[0][0][0]['$match']
+        self.assertEqual(match['category'], {'$in': [None, '', 'Unknown']})
+        self.assertEqual(match['source'], 'Salary')
+        self.assertEqual(match['dateReceived'], {'$gte': datetime(2026, 3, 1), '$lt': datetime(2026, 4, 1)})
+        self.mongo.db.income_rollups.update_one.assert_called_once_with(
+            {'_id': row['_id']}, {'$set': {'min': 10.0, 'max': 20.0}}
+        )
+
+    def test_remove_inner_amount_keeps_extremes(self):
+        self.mongo.db.income_rollups.find_one_and_update.return_value = self.row()
+        self.tracker.apply(self.user_id, {'amount': 30, 'dateReceived': datetime(2026, 3, 5),
+                                          'category': None, 'source': 'Salary'}, -1)
+        self.mongo.db.incomes.aggregate.assert_not_called()
+        self.mongo.db.income_rollups.update_one.assert_not_called()
+
+    def test_remove_last_income_clears_extremes(self):
+        row = self.row(count=0)
+        self.mongo.db.income_rollups.find_one_and_update.return_value = row
+        self.tracker.apply(self.user_id, {'amount': 30, 'dateReceived': datetime(2026, 3, 5),
+                                          'category': None, 'source': 'Salary'}, -1)
+        self.mongo.db.income_rollups.update_one.assert_called_once_with(
+            {'_id': row['_id']}, {'$unset': {'min': '', 'max': ''}}
+        )
+
+    def test_apply_failure_marks_rollups_stale(self):
+        self.mongo.db.income_rollups.update_one.side_effect = Exception('write failed')
+        self.tracker.apply(self.user_id, {'amount': 50, 'dateReceived': datetime(2026, 3, 5)})
+        self.mongo.db.users.update_one.assert_called_once_with(
+            {'_id': self.user_id}, {'$unset': {'incomeRollupsVersion': ''}}
+        )
+
+    def test_apply_update_failure_marks_rollups_stale(self):
+        self.mongo.db.income_rollups.find_one_and_update.side_effect = Exception('write failed')
+        old = {'amount': 5, 'dateReceived': datetime(2026, 3, 5), 'category': 'A', 'source': 'B'}
+        self.tracker.apply_update(self.user_id, old, dict(old, amount=7))
+        self.mongo.db.income_rollups.update_one.assert_not_called()
+        self.mongo.db.users.update_one.assert_called_once_with(
+            {'_id': self.user_id}, {'$unset': {'incomeRollupsVersion': ''}}
+        )
+
+    def test_apply_update_ignores_non_rollup_changes(self):
+        old = {'amount': 5, 'dateReceived': datetime(2026, 3, 5), 'category': 'A', 'source': 'B', 'notes': 'x'}
+        self.tracker.apply_update(self.user_id, old, dict(old, notes='y'))
+        self.mongo.db.income_rollups.update_one.assert_not_called()
+        self.mongo.db.income_rollups.find_one_and_update.assert_not_called()
+
+    def test_rebuild_buckets_empty_values_like_apply(self):
+        self.tracker.rebuild(self.user_id)
+        group_id = self.mongo.db.incomes.aggregate.call_args[0][0][1]['$group']['_id']
+        self.assertEqual(group_id['category'], ir.bucket_expression('category'))
+        self.assertEqual(group_id['source'], ir.bucket_expression('source'))
+        self.mongo.db.income_rollups.delete_many.assert_called_once_with({'userId': self.user_id})
+
+    def test_ensure_built_rebuilds_older_versions(self):
+        with patch.object(self.tracker, 'rebuild') as rebuild:
+            self.tracker.ensure_built({'_id': self.user_id, 'incomeRollupsBuiltAt': datetime.utcnow()})
+            rebuild.assert_called_once_with(self.user_id)
+            rebuild.reset_mock()
+            self.tracker.ensure_built({'_id': self.user_id, 'incomeRollupsVersion': ir.ROLLUP_VERSION,
+                                       'incomeRollupsBuiltAt': datetime.utcnow()})
+            rebuild.assert_not_called()
+
+    def test_ensure_built_rebuilds_old_rollups(self):
+        built_at = datetime.utcnow() - timedelta(seconds=ir.ROLLUP_REBUILD_SECONDS + 60)
+        with patch.object(self.tracker, 'rebuild') as rebuild:
+            self.tracker.ensure_built({'_id': self.user_id, 'incomeRollupsVersion': ir.ROLLUP_VERSION,
+                                       'incomeRollupsBuiltAt': built_at})
+            rebuild.assert_called_once_with(self.user_id)
+
+    def test_get_statistics_merges_rollups_and_edge_months(self):
+        self.mongo.db.income_rollups.aggregate.return_value = [
+            {'_id': {'month': '2026-02', 'source': 'A'}, 'sum': 100.0, 'count': 2, 'min': 40.0, 'max': 60.0}
+        ]
+        self.mongo.db.incomes.aggregate.return_value = [
+            {'_id': {'month': '2026-01', 'source': 'A'}, 'sum': 30.0, 'count': 1, 'min': 30.0, 'max': 30.0},
+            {'_id': {'month': '2026-03', 'source': 'B'}, 'sum': 80.0, 'count': 1, 'min': 80.0, 'max': 80.0}
+        ]
+
+        stats = self.tracker.get_statistics(self.user_id, datetime(2026, 1, 15), datetime(2026, 3, 10))
+
+        rollup_match = self.mongo.db.income_rollups.aggregate.call_args[0][0][0]['$match']
+        self.assertEqual(rollup_match['month'], {'$gte': '2026-02', '$lt': '2026-03'})
+        self.assertEqual(stats, {
+            'count': 4,
+            'totalAmount': 210.0,
+            'maxAmount': 80.0,
+            'minAmount': 30.0,
+            'bySource': {'A': 130.0, 'B': 80.0},
+            'byMonth': {'2026-02': 100.0, '2026-01': 30.0, '2026-03': 80.0}
+        })
+        self.mongo.db.incomes.find.assert_not_called()
+
+    def test_get_statistics_within_one_month_reads_raw_incomes_only(self):
+        self.mongo.db.incomes.aggregate.return_value = []
+        stats = self.tracker.get_statistics(self.user_id, datetime(2026, 3, 2), datetime(2026, 3, 20))
+        self.mongo.db.income_rollups.aggregate.assert_not_called()
+        self.assertEqual((stats['count'], stats['maxAmount'], stats['minAmount']), (0, 0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Background task queue for follow-up writes that do not need to block a response.
+Tasks run in order on a single daemon worker thread per process.
+"""
+
+from typing import Any, Callable, Dict
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTaskQueue:
+    """
+    In-process FIFO queue of callables drained by one daemon worker thread.
+    The worker is started lazily on the first submitted task.
+    """
+
+    def __init__(self, max_queue_size: int = 10000):
+        """
+        Initialize the task queue.
+
+        Args:
+            max_queue_size: Maximum number of pending tasks before submit runs the task inline
+        """
+        self.tasks = queue.Queue(maxsize=max_queue_size)
+        self.worker_thread = None
+        self.processed_count = 0
+        self.failed_count = 0
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable, *args, **kwargs) -> None:
+        """
+        Queue func(*args, **kwargs) to run on the worker thread.
+        If the queue is full the task runs inline so it is never dropped.
+
+        Args:
+            func: Callable to run
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+        """
+        self._ensure_worker()
+        try:
+            self.tasks.put_nowait((func, args, kwargs))
+        except queue.Full:
+            logger.warning(f"Background task queue full, running {getattr(func, '__name__', func)} inline")
+            self._run(func, args, kwargs)
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread if it is not running"""
+        if self.worker_thread and self.worker_thread.is_alive():
+            return
+        with self._lock:
+            if self.worker_thread and self.worker_thread.is_alive():
+                return
+            self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
+            self.worker_thread.start()
+            logger.info("Background task worker started")
+
+    def _worker_loop(self) -> None:
+        """Drain the queue forever"""
+        while True:
+            func, args, kwargs = self.tasks.get()
+            try:
+                self._run(func, args, kwargs)
+            finally:
+                self.tasks.task_done()
+
+    def _run(self, func: Callable, args: tuple, kwargs: Dict[str, Any]) -> None:
+        """Run a single task, logging rather than raising failures"""
+        try:
+            func(*args, **kwargs)
+            self.processed_count += 1
+        except Exception:
+            self.failed_count += 1
+            logger.exception(f"Background task {getattr(func, '__name__', func)} failed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get queue statistics.
+
+        Returns:
+            dict: Pending, processed and failed task counts
+        """
+        return {
+            'pending': self.tasks.qsize(),
+            'processed': self.processed_count,
+            'failed': self.failed_count,
+            'workerAlive': bool(self.worker_thread and self.worker_thread.is_alive())
+        }
+
+
+# Global background task queue instance
+background_tasks = BackgroundTaskQueue()
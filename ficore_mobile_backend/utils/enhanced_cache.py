@@ -207,7 +207,8 @@ class EnhancedCacheService:
             'user_data': ['monthly_totals', 'ytd_counts', 'all_time_counts'],
             'monthly_data': ['monthly_totals'],
             'yearly_data': ['ytd_counts'],
-            'transaction_data': ['monthly_totals', 'ytd_counts', 'all_time_counts']
+            'transaction_data': ['monthly_totals', 'ytd_counts', 'all_time_counts'],
+            'inventory_data': ['inventory_summary', 'inventory_low_stock', 'inventory_valuation']
         }
         
         # Thread lock for thread-safe operations
@@ -0,0 +1,308 @@
+"""
+Income rollups for the income statistics endpoint.
+Maintains per-user month x category x source sums in the income_rollups collection
+so long date ranges are answered from a few pre-aggregated rows instead of every income.
+"""
+
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument
+from typing import Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Income fields that determine which rollup row an income contributes to
+ROLLUP_FIELDS = ('amount', 'dateReceived', 'category', 'source')
+
+# Bumped when the rollup row layout changes, so ensure_built rebuilds rows written by older code
+ROLLUP_VERSION = 2
+
+# Rollups are rebuilt from the raw incomes once they are this old, so any drift is bounded
+ROLLUP_REBUILD_SECONDS = 24 * 60 * 60
+
+# Bucket name for incomes with a missing, null or empty category or source
+UNKNOWN_BUCKET = 'Unknown'
+
+
+def bucket_name(value: Any) -> str:
+    """Get the rollup bucket for a category or source value"""
+    return value if value not in (None, '') else UNKNOWN_BUCKET
+
+
+def bucket_expression(field: str) -> Dict[str, Any]:
+    """Aggregation expression computing bucket_name for an income field"""
+    return {'$cond': [
+        {'$eq': [{'$ifNull': [f'${field}', '']}, '']},
+        UNKNOWN_BUCKET,
+        f'${field}'
+    ]}
+
+
+def bucket_filter(bucket: str) -> Any:
+    """Income query condition matching every value that falls in a bucket"""
+    if bucket == UNKNOWN_BUCKET:
+        return {'$in': [None, '', UNKNOWN_BUCKET]}
+    return bucket
+
+
+class IncomeRollupTracker:
+    """
+    Keeps the income_rollups collection in step with the incomes collection.
+    Each rollup row holds {'userId', 'month', 'category', 'source', 'sum', 'count', 'min', 'max'}.
+    """
+
+    def __init__(self, mongo):
+        self.mongo = mongo
+
+    @staticmethod
+    def get_month_key(date: datetime) -> str:
+        """Get month key in format YYYY-MM"""
+        return f"{date.year:04d}-{date.month:02d}"
+
+    @staticmethod
+    def _month_start(date: datetime) -> datetime:
+        return datetime(date.year, date.month, 1)
+
+    @staticmethod
+    def _next_month_start(date: datetime) -> datetime:
+        if date.month == 12:
+            return datetime(date.year + 1, 1, 1)
+        return datetime(date.year, date.month + 1, 1)
+
+    def apply(self, user_id: ObjectId, income: Dict[str, Any], sign: int = 1) -> None:
+        """
+        Add (sign=1) or remove (sign=-1) a single income from its rollup row.
+        Removals must run after the income itself is deleted or changed.
+        The income is already committed, so a failure marks the rollups stale instead of raising.
+        """
+        try:
+            self._apply(user_id, income, sign)
+        except Exception:
+            logger.exception(f"Failed to apply income to rollups for user {user_id}")
+            self.mark_stale(user_id)
+
+    def _apply(self, user_id: ObjectId, income: Dict[str, Any], sign: int) -> None:
+        """Apply a single income to its rollup row, raising on failure"""
+        date_received = income.get('dateReceived')
+        if not isinstance(date_received, datetime):
+            return
+
+        amount = float(income.get('amount') or 0)
+        row_filter = {
+            'userId': user_id,
+            'month': self.get_month_key(date_received),
+            'category': bucket_name(income.get('category')),
+            'source': bucket_name(income.get('source'))
+        }
+
+        if sign > 0:
+            self.mongo.db.income_rollups.update_one(
+                row_filter,
+                {
+                    '$inc': {'sum': amount, 'count': 1},
+                    '$min': {'min': amount},
+                    '$max': {'max': amount}
+                },
+                upsert=True
+            )
+            return
+
+        row = self.mongo.db.income_rollups.find_one_and_update(
+            row_filter,
+            {'$inc': {'sum': -amount, 'count': -1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if not row:
+            return
+        if row['count'] <= 0:
+            # An empty row must not keep stale extremes for the next income $min/$max'd into it
+            self.mongo.db.income_rollups.update_one({'_id': row['_id']}, {'$unset': {'min': '', 'max': ''}})
+        elif amount <= row.get('min', amount) or amount >= row.get('max', amount):
+            # Extremes are not invertible, so recompute them when the removed income may have been one
+            self._refresh_extremes(row)
+
+    def apply_update(self, user_id: ObjectId, old_income: Dict[str, Any], new_income: Dict[str, Any]) -> None:
+        """
+        Move an updated income between rollup rows if any rollup field changed.
+        """
+        if all(old_income.get(field) == new_income.get(field) for field in ROLLUP_FIELDS):
+            return
+        try:
+            self._apply(user_id, old_income, -1)
+            self._apply(user_id, new_income, 1)
+        except Exception:
+            logger.exception(f"Failed to move updated income between rollups for user {user_id}")
+            self.mark_stale(user_id)
+
+    def mark_stale(self, user_id: ObjectId) -> None:
+        """Clear the user's rollup version so the next ensure_built rebuilds from the raw incomes"""
+        try:
+            self.mongo.db.users.update_one({'_id': user_id}, {'$unset': {'incomeRollupsVersion': ''}})
+        except Exception:
+            logger.exception(f"Failed to mark income rollups stale for user {user_id}")
+
+    def _refresh_extremes(self, row: Dict[str, Any]) -> None:
+        """Recompute a rollup row's min and max from the incomes in its month, category and source"""
+        month_start = datetime.strptime(row['month'], '%Y-%m')
+        extremes = list(self.mongo.db.incomes.aggregate([
+            {'$match': {
+                'userId': row['userId'],
+                'dateReceived': {'$gte': month_start, '$lt': self._next_month_start(month_start)},
+                'category': bucket_filter(row['category']),
+                'source': bucket_filter(row['source'])
+            }},
+            {'$group': {'_id': None, 'min': {'$min': '$amount'}, 'max': {'$max': '$amount'}}}
+        ]))
+        if extremes:
+            update = {'$set': {'min': extremes[0]['min'], 'max': extremes[0]['max']}}
+        else:
+            update = {'$unset': {'min': '', 'max': ''}}
+        self.mongo.db.income_rollups.update_one({'_id': row['_id']}, update)
+
+    def delete_user_rollups(self, user_id: ObjectId) -> int:
+        """Remove every rollup row for a user"""
+        return self.mongo.db.income_rollups.delete_many({'userId': user_id}).deleted_count
+
+    def rebuild(self, user_id: ObjectId) -> None:
+        """
+        Recompute a user's rollups from their raw incomes in a single server-side pass.
+        """
+        self.delete_user_rollups(user_id)
+        self.mongo.db.incomes.aggregate([
+            {'$match': {'userId': user_id, 'dateReceived': {'$type': 'date'}}},
+            {'$group': {
+                '_id': {
+                    'month': {'$dateToString': {'format': '%Y-%m', 'date': '$dateReceived'}},
+                    'category': bucket_expression('category'),
+                    'source': bucket_expression('source')
+                },
+                'sum': {'$sum': '$amount'},
+                'count': {'$sum': 1},
+                'min': {'$min': '$amount'},
+                'max': {'$max': '$amount'}
+            }},
+            {'$project': {
+                '_id': 0,
+                'userId': {'$literal': user_id},
+                'month': '$_id.month',
+                'category': '$_id.category',
+                'source': '$_id.source',
+                'sum': 1,
+                'count': 1,
+                'min': 1,
+                'max': 1
+            }},
+            {'$merge': {
+                'into': 'income_rollups',
+                'on': ['userId', 'month', 'category', 'source'],
+                'whenMatched': 'replace',
+                'whenNotMatched': 'insert'
+            }}
+        ])
+        self.mongo.db.users.update_one(
+            {'_id': user_id},
+            {'$set': {'incomeRollupsBuiltAt': datetime.utcnow(), 'incomeRollupsVersion': ROLLUP_VERSION}}
+        )
+        logger.info(f"Rebuilt income rollups for user {user_id}")
+
+    def ensure_built(self, user: Dict[str, Any]) -> None:
+        """
+        Backfill rollups for users whose incomes predate the rollup collection,
+        whose rows were built by an older ROLLUP_VERSION or marked stale,
+        or that were last built more than ROLLUP_REBUILD_SECONDS ago.
+        """
+        built_at = user.get('incomeRollupsBuiltAt')
+        if user.get('incomeRollupsVersion') != ROLLUP_VERSION or not built_at or \
+                (datetime.utcnow() - built_at).total_seconds() > ROLLUP_REBUILD_SECONDS:
+            self.rebuild(user['_id'])
+
+    def get_statistics(self, user_id: ObjectId, start_date: datetime, end_date: datetime,
+                       max_time_ms: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get income totals for [start_date, end_date] combining rollups for whole months
+        with a raw aggregation over the partial months at either edge of the range.
+
+        Returns: {
+            'count': int,
+            'totalAmount': float,
+            'maxAmount': float,
+            'minAmount': float,
+            'bySource': dict,
+            'byMonth': dict
+        }
+        """
+        query_options = {'maxTimeMS': max_time_ms} if max_time_ms else {}
+
+        # Whole months are [first_full, after_full); anything outside is an edge
+        first_full = start_date if start_date == self._month_start(start_date) else self._next_month_start(start_date)
+        after_full = self._month_start(end_date + timedelta(microseconds=1))
+
+        groups = []
+        if first_full < after_full:
+            groups.extend(self.mongo.db.income_rollups.aggregate([
+                {'$match': {
+                    'userId': user_id,
+                    'month': {
+                        '$gte': self.get_month_key(first_full),
+                        '$lt': self.get_month_key(after_full)
+                    },
+                    'count': {'$gt': 0}
+                }},
+                {'$group': {
+                    '_id': {'month': '$month', 'source': '$source'},
+                    'sum': {'$sum': '$sum'},
+                    'count': {'$sum': '$count'},
+                    'min': {'$min': '$min'},
+                    'max': {'$max': '$max'}
+                }}
+            ], **query_options))
+            edge_ranges = [
+                {'dateReceived': {'$gte': start_date, '$lt': first_full}},
+                {'dateReceived': {'$gte': after_full, '$lte': end_date}}
+            ]
+        else:
+            edge_ranges = [{'dateReceived': {'$gte': start_date, '$lte': end_date}}]
+
+        groups.extend(self.mongo.db.incomes.aggregate([
+            {'$match': {'userId': user_id, '$or': edge_ranges}},
+            {'$group': {
+                '_id': {
+                    'month': {'$dateToString': {'format': '%Y-%m', 'date': '$dateReceived'}},
+                    'source': bucket_expression('source')
+                },
+                'sum': {'$sum': '$amount'},
+                'count': {'$sum': 1},
+                'min': {'$min': '$amount'},
+                'max': {'$max': '$amount'}
+            }}
+        ], **query_options))
+
+        count = 0
+        total_amount = 0
+        by_source = {}
+        by_month = {}
+        max_amount = None
+        min_amount = None
+        for group in groups:
+            group_sum = group['sum']
+            source = group['_id']['source']
+            month = group['_id']['month']
+            count += group['count']
+            total_amount += group_sum
+            by_source[source] = by_source.get(source, 0) + group_sum
+            by_month[month] = by_month.get(month, 0) + group_sum
+            # Extremes come from the rollup rows and edge groups, so no income is read for them
+            if group.get('max') is not None and (max_amount is None or group['max'] > max_amount):
+                max_amount = group['max']
+            if group.get('min') is not None and (min_amount is None or group['min'] < min_amount):
+                min_amount = group['min']
+
+        return {
+            'count': count,
+            'totalAmount': total_amount,
+            'maxAmount': max_amount or 0,
+            'minAmount': min_amount or 0,
+            'bySource': by_source,
+            'byMonth': by_month
+        }